@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+"""
+Micro benchmarks for the knob geometry and paint paths.
+
+Sweeps knob size, tick frequency, value range width and knob style and
+times
+
+    geometry:       building the tick geometry and tick colour bands of a
+                    Handler
+    thumb_position: placing the thumb after the value changed
+    neon_colour:    finding the tick colour band of the value
+    paint:          a cold paint (no cached layers, pooled resources or
+                    tick geometry) into an offscreen wx.MemoryDC
+    paint_warm:     a paint with the static layers already cached
+    value_step:     moving the value one increment and repainting the
+                    damaged area only
+    ctrl_paint:     a full repaint of a KnobCtrl, from Refresh through
+                    OnPaint and its BufferedPaintDC to the screen
+
+The results are written as JSON so runs can be compared. Painting needs a
+display, on a headless machine run it under Xvfb
+
+    xvfb-run -a python benchmark.py --output run.json
+    xvfb-run -a python benchmark.py --compare run.json
+
+--compare exits with status 1 when a case got slower than the threshold.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import wx
+
+import knobCore
+import wxVolumeCtrl
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+SIZES = (100, 300, 600)
+TICK_FREQUENCIES = (1.0, 2.0, 5.0)
+RANGES = (100.0, 1000.0)
+STYLES = (
+    ('default', wxVolumeCtrl.DefaultKnobStyle),
+    ('ticks', wxVolumeCtrl.KNOB_TICKS),
+    ('plain', 0)
+)
+
+QUICK_SIZES = (100, 600)
+QUICK_TICK_FREQUENCIES = (1.0, 5.0)
+QUICK_RANGES = (100.0,)
+
+TICK_COLOURS = [(0, 255, 0, 255), (255, 187, 0, 255), (255, 0, 0, 255)]
+BACKGROUND_COLOUR = wx.Colour(80, 80, 80)
+
+
+def create_handler(size, tick_frequency, value_range, knob_style):
+    handler = knobCore.Handler()
+    handler.min_value = 0.0
+    handler.max_value = value_range
+    handler.increment = 1.0
+    handler.value = value_range / 2.0
+    handler.tick_frequency = tick_frequency
+    handler.background_colour = BACKGROUND_COLOUR
+    handler.foreground_colour = (0, 0, 0, 255)
+    handler.secondary_colour = (225, 225, 225, 255)
+    handler.tick_range_colors = TICK_COLOURS
+    handler.tick_ranges = [value_range * 0.75, value_range * 0.90, value_range]
+    handler.size = (size, size)
+
+    handler.glow = bool(knob_style & wxVolumeCtrl.KNOB_GLOW)
+    handler.depression = bool(knob_style & wxVolumeCtrl.KNOB_DEPRESSION)
+    handler.thumb_glow = bool(knob_style & wxVolumeCtrl.KNOB_HANDLE_GLOW)
+    handler.ticks = bool(knob_style & wxVolumeCtrl.KNOB_TICKS)
+    handler.shadow = bool(knob_style & wxVolumeCtrl.KNOB_SHADOW)
+
+    return handler
+
+
+def get_knob_style(handler):
+    knob_style = 0
+
+    for flag, enabled in (
+        (wxVolumeCtrl.KNOB_GLOW, handler.glow),
+        (wxVolumeCtrl.KNOB_DEPRESSION, handler.depression),
+        (wxVolumeCtrl.KNOB_HANDLE_GLOW, handler.thumb_glow),
+        (wxVolumeCtrl.KNOB_TICKS, handler.ticks),
+        (wxVolumeCtrl.KNOB_SHADOW, handler.shadow)
+    ):
+        if enabled:
+            knob_style |= flag
+
+    return knob_style
+
+
+def clear_caches(handler, renderer=None):
+    """
+    Drops everything a first paint of the knob has to build.
+    """
+    if renderer is not None:
+        renderer.invalidate()
+
+    wxVolumeCtrl.resource_pool.clear()
+    knobCore.clear_geometry_caches()
+
+    # setting the size drops the cached geometry of the handler
+    handler.size = handler.size
+
+
+def measure(func, repeat, setup=None):
+    """
+    Runs `func` `repeat` times and returns the timings in microseconds.
+    """
+    times = []
+
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+
+        start = _clock()
+        func()
+        times += [(_clock() - start) * 1000000.0]
+
+    times.sort()
+
+    return dict(
+        min=times[0],
+        median=times[len(times) // 2],
+        mean=sum(times) / len(times),
+        max=times[-1],
+        repeat=repeat
+    )
+
+
+class Target(object):
+    """
+    Offscreen wx.MemoryDC the benchmarks paint into.
+    """
+
+    def __init__(self, size):
+        self.bmp = wx.EmptyBitmapRGBA(size, size)
+        self.dc = wx.MemoryDC()
+        self.dc.SelectObject(self.bmp)
+
+    def blit(self, bmp, clip=None):
+        gcdc = wx.GCDC(self.dc)
+
+        if clip is not None:
+            gcdc.SetClippingRegion(*clip)
+
+        gcdc.DrawBitmap(bmp, 0, 0)
+        gcdc.Destroy()
+
+    def close(self):
+        self.dc.SelectObject(wx.NullBitmap)
+        self.dc.Destroy()
+
+
+def bench_geometry(handler, repeat):
+
+    def setup():
+        clear_caches(handler)
+
+    def run():
+        _ = handler.tick_geometry
+        _ = handler.tick_bands
+
+    return measure(run, repeat, setup)
+
+
+def step_value(handler, state):
+    """
+    Moves the value one increment, turning around at the ends of the range.
+    """
+    old_value = handler.value
+    value = old_value + handler.increment * state['direction']
+
+    if not handler.min_value <= value <= handler.max_value:
+        state['direction'] = -state['direction']
+        value = old_value + handler.increment * state['direction']
+
+    handler.value = value
+    return old_value
+
+
+def bench_thumb_position(handler, repeat):
+    state = dict(direction=1.0)
+
+    def setup():
+        step_value(handler, state)
+
+    def run():
+        _ = handler.thumb_position
+
+    return measure(run, repeat, setup)
+
+
+def bench_neon_colour(handler, repeat):
+    state = dict(direction=1.0)
+    _ = handler.tick_bands
+
+    def setup():
+        step_value(handler, state)
+
+    def run():
+        _ = handler.neon_colour
+
+    return measure(run, repeat, setup)
+
+
+def bench_paint(handler, repeat):
+    renderer = wxVolumeCtrl.KnobRenderer(handler)
+    target = Target(handler.size[0])
+
+    def run():
+        target.blit(renderer.render(BACKGROUND_COLOUR))
+
+    def setup():
+        clear_caches(handler, renderer)
+
+    try:
+        return measure(run, repeat, setup)
+    finally:
+        target.close()
+
+
+def bench_paint_warm(handler, repeat):
+    renderer = wxVolumeCtrl.KnobRenderer(handler)
+    target = Target(handler.size[0])
+
+    def run():
+        target.blit(renderer.render(BACKGROUND_COLOUR))
+
+    run()
+
+    try:
+        return measure(run, repeat)
+    finally:
+        target.close()
+
+
+def bench_value_step(handler, repeat):
+    renderer = wxVolumeCtrl.KnobRenderer(handler)
+    target = Target(handler.size[0])
+    target.blit(renderer.render(BACKGROUND_COLOUR))
+
+    state = dict(direction=1.0)
+
+    def run():
+        rect = wx.Rect(*handler.thumb_box)
+        old_value = step_value(handler, state)
+        value = handler.value
+        rect = rect.Union(wx.Rect(*handler.thumb_box))
+
+        if handler.ticks:
+            tick_box = handler.get_tick_box(old_value, value)
+            if tick_box is not None:
+                rect = rect.Union(wx.Rect(*tick_box))
+
+        clip = rect.Get()
+        target.blit(renderer.render(BACKGROUND_COLOUR, clip), clip)
+
+    try:
+        return measure(run, repeat)
+    finally:
+        target.close()
+
+
+def bench_ctrl_paint(handler, repeat):
+    size = handler.size[0]
+    frame = wx.Frame(None, size=(size + 50, size + 50))
+    ctrl = wxVolumeCtrl.KnobCtrl(
+        frame,
+        value=handler.value,
+        minValue=handler.min_value,
+        maxValue=handler.max_value,
+        increment=handler.increment,
+        size=(size, size),
+        knobStyle=get_knob_style(handler)
+    )
+    ctrl.SetTickFrequency(handler.tick_frequency)
+    ctrl.SetTickColours(handler.tick_range_colors)
+    ctrl.SetTickColourRanges(handler.tick_ranges)
+    ctrl.SetSecondaryColour(handler.secondary_colour)
+    ctrl.SetBackgroundColour(BACKGROUND_COLOUR)
+    frame.Show()
+
+    def run():
+        # the paint event is handled before Update returns
+        ctrl.Refresh()
+        ctrl.Update()
+
+    run()
+
+    try:
+        return measure(run, repeat)
+    finally:
+        frame.Destroy()
+
+
+BENCHMARKS = (
+    ('geometry', bench_geometry),
+    ('thumb_position', bench_thumb_position),
+    ('neon_colour', bench_neon_colour),
+    ('paint', bench_paint),
+    ('paint_warm', bench_paint_warm),
+    ('value_step', bench_value_step),
+    ('ctrl_paint', bench_ctrl_paint)
+)
+
+
+def case_name(bench_name, params):
+    return '{0}[size={size},tick_frequency={tick_frequency},range={range},style={style}]'.format(
+        bench_name,
+        **params
+    )
+
+
+def run(repeat, quick=False, selected=None):
+    if quick:
+        sizes, tick_frequencies, ranges = QUICK_SIZES, QUICK_TICK_FREQUENCIES, QUICK_RANGES
+    else:
+        sizes, tick_frequencies, ranges = SIZES, TICK_FREQUENCIES, RANGES
+
+    results = []
+
+    for size in sizes:
+        for tick_frequency in tick_frequencies:
+            for value_range in ranges:
+                for style_name, knob_style in STYLES:
+                    params = dict(
+                        size=size,
+                        tick_frequency=tick_frequency,
+                        range=value_range,
+                        style=style_name
+                    )
+
+                    for bench_name, bench in BENCHMARKS:
+                        if selected and bench_name not in selected:
+                            continue
+
+                        handler = create_handler(size, tick_frequency, value_range, knob_style)
+                        timings = bench(handler, repeat)
+
+                        results += [dict(
+                            name=case_name(bench_name, params),
+                            benchmark=bench_name,
+                            params=params,
+                            times_us=timings
+                        )]
+
+                        sys.stderr.write(
+                            '{0:<80} {1:>12.1f} us\n'.format(results[-1]['name'], timings['median'])
+                        )
+
+    return dict(
+        python=platform.python_version(),
+        platform=platform.platform(),
+        wx=wx.version(),
+        numpy=knobCore.numpy is not None,
+        repeat=repeat,
+        results=results
+    )
+
+
+def compare(baseline, current, threshold):
+    """
+    Compares the median timings of two runs.
+
+    :return: list of (name, baseline median, current median, ratio) for the
+        cases that got slower by more than `threshold`
+    """
+    baseline_results = dict((result['name'], result) for result in baseline['results'])
+    regressions = []
+
+    for result in current['results']:
+        try:
+            old = baseline_results[result['name']]['times_us']['median']
+        except KeyError:
+            continue
+
+        new = result['times_us']['median']
+        ratio = new / old if old else 0.0
+
+        if ratio > 1.0 + threshold:
+            regressions += [(result['name'], old, new, ratio)]
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help='runs per case')
+    parser.add_argument('--quick', action='store_true', help='run a reduced sweep')
+    parser.add_argument(
+        '--benchmark',
+        action='append',
+        choices=[name for name, _ in BENCHMARKS],
+        help='only run this benchmark, can be given more than once'
+    )
+    parser.add_argument('--output', help='write the JSON results to this file instead of stdout')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.10,
+        help='slowdown ratio reported as a regression by --compare (default 0.10)'
+    )
+    args = parser.parse_args(argv)
+
+    app = wx.App(False)
+    results = run(args.repeat, args.quick, args.benchmark)
+    del app
+
+    data = json.dumps(results, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(data)
+    else:
+        sys.stdout.write(data + '\n')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        regressions = compare(baseline, results, args.threshold)
+
+        for name, old, new, ratio in regressions:
+            sys.stderr.write(
+                'REGRESSION {0}: {1:.1f} us -> {2:.1f} us ({3:.2f}x)\n'.format(name, old, new, ratio)
+            )
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
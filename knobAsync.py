@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio bridge for KnobCtrl and the knobs of a KnobBank, Python 3.7+.
+
+wx runs on the GUI thread and asyncio on its loop, which may be another
+thread. AsyncKnob moves value changes from the GUI thread to the loop with
+`loop.call_soon_threadsafe` and calls into the knob with `wx.CallAfter`, so
+any number of knobs can be followed from async code without a thread per
+knob or polling
+
+    knob = AsyncKnob(ctrl)
+
+    async with knob.changes(maxsize=16) as changes:
+        async for value in changes:
+            ...
+
+    await knob.set_value(50.0)
+    await knob.animate_to(0.0, duration=0.5)
+"""
+
+import asyncio
+import collections
+
+import wx
+
+from wxVolumeCtrl import (
+    EVT_KNOB_CHANGE,
+    KNOB_CHANGE_CHANGED,
+    KnobChangeEvent,
+    ease_in_out_cubic
+)
+
+
+class KnobChanges(object):
+    """
+    Async iterator of the values a knob changes to.
+
+    Values are buffered, once `maxsize` values are waiting the oldest one is
+    dropped for every new one and counted in `dropped`. A consumer that
+    falls behind always gets the newest values.
+    """
+
+    def __init__(self, knob, maxsize=64, loop=None):
+        if maxsize <= 0:
+            raise ValueError('maxsize must be greater than 0')
+
+        self._knob = knob
+        self._loop = loop or asyncio.get_running_loop()
+        self._buffer = collections.deque(maxlen=maxsize)
+        self._waiter = None
+        self._closed = False
+        self.dropped = 0
+
+        # binding is only safe on the GUI thread
+        wx.CallAfter(self._bind)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """
+        Stops following the knob, the values still buffered are returned
+        before the iteration ends.
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+        wx.CallAfter(self._unbind)
+        self._wake()
+
+    def _bind(self):
+        if self._closed:
+            return
+
+        source = self._knob._event_object
+        source.Bind(wx.EVT_SCROLL_CHANGED, self._on_changed, id=self._knob.GetId())
+        source.Bind(EVT_KNOB_CHANGE, self._on_changed, id=self._knob.GetId())
+
+    def _unbind(self):
+        source = self._knob._event_object
+
+        # the window may have been destroyed already
+        if not source:
+            return
+
+        source.Unbind(wx.EVT_SCROLL_CHANGED, id=self._knob.GetId(), handler=self._on_changed)
+        source.Unbind(EVT_KNOB_CHANGE, id=self._knob.GetId(), handler=self._on_changed)
+
+    def _on_changed(self, evt):
+        evt.Skip()
+
+        if self._closed:
+            return
+
+        if isinstance(evt, KnobChangeEvent) and not evt.HasFlag(KNOB_CHANGE_CHANGED):
+            return
+
+        # the consolidated event is reused, take the value out of it now
+        self._loop.call_soon_threadsafe(self._put, evt.GetPosition())
+
+    def _put(self, value):
+        if self._closed:
+            return
+
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+
+        self._buffer.append(value)
+        self._wake()
+
+    def _wake(self):
+        waiter = self._waiter
+
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._buffer:
+            if self._closed:
+                raise StopAsyncIteration
+
+            self._waiter = self._loop.create_future()
+
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+        return self._buffer.popleft()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class AsyncKnob(object):
+    """
+    Awaitable access to a KnobCtrl or a BankKnob from an asyncio loop.
+
+    :param loop: loop the awaitables belong to, the running loop when None,
+                 it has to be passed when the knob is wrapped outside of a
+                 coroutine.
+    """
+
+    def __init__(self, knob, loop=None):
+        self._knob = knob
+        self._loop = loop or asyncio.get_running_loop()
+
+    @property
+    def knob(self):
+        return self._knob
+
+    def changes(self, maxsize=64):
+        """
+        :param maxsize: most values buffered before the oldest are dropped.
+        :return: KnobChanges
+        """
+        return KnobChanges(self._knob, maxsize, self._loop)
+
+    def _resolve(self, future, result=None, exception=None):
+        # runs on the loop
+        if future.done():
+            return
+
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def _resolve_threadsafe(self, future, result=None, exception=None):
+        self._loop.call_soon_threadsafe(self._resolve, future, result, exception)
+
+    async def set_value(self, value):
+        """
+        Sets the value of the knob and returns once it has been painted, or
+        once the frame it would have been painted in has passed while the
+        knob is hidden.
+        """
+        future = self._loop.create_future()
+
+        def apply():
+            try:
+                self._knob.SetValue(value)
+            except ValueError as err:
+                self._resolve_threadsafe(future, exception=err)
+                return
+
+            self._knob._call_after_paint(lambda: self._resolve_threadsafe(future))
+
+        wx.CallAfter(apply)
+        await future
+
+    async def animate_to(self, value, duration=0.25, easing=ease_in_out_cubic):
+        """
+        Animates the knob to `value` and returns once the last frame has
+        been painted, or skipped while the knob is hidden. Cancelling the awaiting task cancels the animation.
+
+        :return: False when the animation was cancelled before it completed
+        """
+        future = self._loop.create_future()
+        animations = []
+
+        def on_done(animation):
+            self._knob._call_after_paint(
+                lambda: self._resolve_threadsafe(future, not animation.cancelled)
+            )
+
+        def apply():
+            if future.done():
+                return
+
+            try:
+                animations.append(self._knob.AnimateTo(value, duration, easing, on_done))
+            except ValueError as err:
+                self._resolve_threadsafe(future, exception=err)
+
+        def on_cancelled(_):
+            if future.cancelled():
+                wx.CallAfter(cancel)
+
+        def cancel():
+            for animation in animations:
+                animation.cancel()
+
+        future.add_done_callback(on_cancelled)
+        wx.CallAfter(apply)
+
+        return await future
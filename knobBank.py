@@ -0,0 +1,509 @@
+# -*- coding: utf-8 -*-
+"""
+Many knobs drawn in a single scrolled window.
+
+Every KnobCtrl is a native window with its own paint, size, mouse and key
+handling, which gets slow at a few hundred knobs. A KnobBank lays its knobs
+out in a grid, paints the ones inside the damaged part of the viewport in a
+single paint pass and hit-tests the mouse to route input to a knob. Knobs
+scrolled out of view are not rendered at all.
+
+Each knob sends the same events a KnobCtrl does, from the bank and with the
+id of the knob
+
+    knob = bank.AddKnob(maxValue=10.0)
+    bank.Bind(wx.EVT_SCROLL_CHANGED, on_changed, id=knob.GetId())
+"""
+
+import wx
+
+from wxVolumeCtrl import (
+    DefaultKnobStyle,
+    KnobMixin,
+    RepaintScheduler,
+    _clock,
+    resource_pool
+)
+
+
+KnobBankNameStr = 'Knob Bank'
+
+
+class _KnobRepaint(object):
+    """
+    Stands in for the RepaintScheduler of a knob in a bank, damage is moved
+    to where the knob sits in the bank and merged into the frames of the
+    bank.
+    """
+
+    def __init__(self, bank, knob):
+        self.instrumentation = None
+        self._bank = bank
+        self._knob = knob
+
+    @property
+    def max_fps(self):
+        return self._bank._repaint.max_fps
+
+    @max_fps.setter
+    def max_fps(self, value):
+        self._bank._repaint.max_fps = value
+
+    @property
+    def pending(self):
+        return self._bank._repaint.pending
+
+    def invalidate(self, rect=None, source=None):
+        if self.instrumentation is not None:
+            self.instrumentation.count('invalidate.' + (source or 'other'))
+
+        self._bank._invalidate_knob(self._knob, rect, source)
+
+    def flush(self):
+        self._bank._repaint.flush()
+
+
+# noinspection PyPep8Naming
+class BankKnob(KnobMixin):
+    """
+    One knob of a KnobBank, it has the value, range, style and animation
+    methods of a KnobCtrl.
+    """
+
+    # noinspection PyShadowingBuiltins
+    def __init__(self, bank, index, id, value, minValue, maxValue, increment, knobStyle):
+        self._bank = bank
+        self._index = index
+        self._id = id
+        self._repaint = _KnobRepaint(bank, self)
+        self._init_knob(bank, bank, value, minValue, maxValue, increment, knobStyle)
+        self._handler.background_colour = bank.GetBackgroundColour()
+        self._handler.foreground_colour = bank.GetForegroundColour()
+        self._handler.size = bank.GetKnobSize()
+
+    # a knob is only usable as long as its bank is
+    def __nonzero__(self):
+        return bool(self._bank)
+
+    __bool__ = __nonzero__
+
+    def GetId(self):
+        return self._id
+
+    def GetIndex(self):
+        return self._index
+
+    def GetBank(self):
+        return self._bank
+
+    def GetRect(self):
+        """
+        :return: wx.Rect of the knob in the unscrolled coordinates of the bank
+        """
+        return wx.Rect(*self._bank._get_knob_rect(self._index))
+
+    def _call_after_paint(self, callback):
+        # knobs out of the viewport are not painted, wait for the bank
+        self._bank._call_after_paint(callback)
+
+    def HasCapture(self):
+        return self._bank._drag_knob is self and self._bank.HasCapture()
+
+    def CaptureMouse(self):
+        self._bank._drag_knob = self
+
+        if not self._bank.HasCapture():
+            self._bank.CaptureMouse()
+
+    def ReleaseMouse(self):
+        if self._bank._drag_knob is self:
+            self._bank._drag_knob = None
+
+        if self._bank.HasCapture():
+            self._bank.ReleaseMouse()
+
+
+# noinspection PyPep8Naming
+class KnobBank(wx.ScrolledWindow):
+
+    # noinspection PyShadowingBuiltins
+    def __init__(
+        self,
+        parent,
+        id=wx.ID_ANY,
+        knobSize=(100, 100),
+        pos=wx.DefaultPosition,
+        size=wx.DefaultSize,
+        style=wx.HSCROLL | wx.VSCROLL,
+        name=KnobBankNameStr
+    ):
+
+        wx.ScrolledWindow.__init__(
+            self,
+            parent,
+            id=id,
+            pos=pos,
+            size=size,
+            style=style | wx.BORDER_NONE,
+            name=name
+        )
+
+        self.SetBackgroundColour(parent.GetBackgroundColour())
+
+        self._knob_size = tuple(knobSize)
+        self._knobs = []
+        self._columns = 1
+        self._drag_knob = None
+        self._focus_knob = None
+        self._paint_callbacks = []
+        self._repaint = RepaintScheduler(self)
+        self._repaint.on_unpainted = self._run_paint_callbacks
+
+        self.SetScrollRate(max(1, self._knob_size[0] // 4), max(1, self._knob_size[1] // 4))
+
+        self.Bind(wx.EVT_PAINT, self.OnPaint)
+        self.Bind(wx.EVT_SIZE, self._on_size)
+        self.Bind(wx.EVT_ERASE_BACKGROUND, self._on_erase_background)
+        self.Bind(wx.EVT_MOUSE_CAPTURE_LOST, self._on_mouse_lost_capture)
+        self.Bind(wx.EVT_LEFT_DOWN, self._on_mouse_left_down)
+        self.Bind(wx.EVT_LEFT_UP, self._on_mouse_left_up)
+        self.Bind(wx.EVT_MOTION, self._on_mouse_move)
+        self.Bind(wx.EVT_MOUSEWHEEL, self._on_mouse_wheel)
+        self.Bind(wx.EVT_CHAR_HOOK, self._on_char_hook)
+
+    # noinspection PyShadowingBuiltins
+    def AddKnob(
+        self,
+        id=wx.ID_ANY,
+        value=0.0,
+        minValue=0.0,
+        maxValue=100.0,
+        increment=1.0,
+        knobStyle=DefaultKnobStyle
+    ):
+        """
+        Adds a knob at the end of the bank.
+
+        Frame caching is opt-in the same way it is for a KnobCtrl, pass the
+        module level `frame_cache` to SetFrameCache on the knobs that should
+        share rendered frames.
+
+        :param id: id the events of the knob are sent with, a new id is
+            made for wx.ID_ANY.
+        :return: BankKnob
+        """
+        if id == wx.ID_ANY:
+            id = wx.Window.NewControlId()
+
+        knob = BankKnob(
+            self,
+            len(self._knobs),
+            id,
+            value,
+            minValue,
+            maxValue,
+            increment,
+            knobStyle
+        )
+        self._knobs += [knob]
+        self._layout()
+        self._invalidate_knob(knob, None, 'add')
+
+        return knob
+
+    def GetKnob(self, index):
+        return self._knobs[index]
+
+    def GetKnobCount(self):
+        return len(self._knobs)
+
+    def GetKnobAt(self, x, y):
+        """
+        :param x: x in client coordinates.
+        :param y: y in client coordinates.
+        :return: the BankKnob under the point or None
+        """
+        x, y = self.CalcUnscrolledPosition(x, y)
+        cell_width, cell_height = self._knob_size
+
+        if x < 0 or y < 0:
+            return None
+
+        column = x // cell_width
+
+        if column >= self._columns:
+            return None
+
+        index = (y // cell_height) * self._columns + column
+
+        if index >= len(self._knobs):
+            return None
+
+        return self._knobs[index]
+
+    def GetKnobSize(self):
+        return self._knob_size
+
+    def SetKnobSize(self, size):
+        self._knob_size = tuple(size)
+
+        for knob in self._knobs:
+            knob._handler.size = self._knob_size
+
+        self.SetScrollRate(max(1, self._knob_size[0] // 4), max(1, self._knob_size[1] // 4))
+        self._layout()
+        self._repaint.invalidate(source='size')
+
+    def GetMaxFrameRate(self):
+        return self._repaint.max_fps
+
+    def SetMaxFrameRate(self, value):
+        """
+        Sets the most times per second the bank repaints, the changes of all
+        of the knobs made between two frames are painted together.
+        """
+        self._repaint.max_fps = value
+
+    def FlushRefresh(self):
+        self._repaint.flush()
+
+    def _call_after_paint(self, callback):
+        if self._repaint.pending:
+            self._paint_callbacks += [callback]
+        else:
+            callback()
+
+    def _run_paint_callbacks(self):
+        callbacks, self._paint_callbacks = self._paint_callbacks, []
+
+        for callback in callbacks:
+            callback()
+
+    def _layout(self):
+        width = self.GetClientSize()[0]
+        cell_width, cell_height = self._knob_size
+
+        self._columns = max(1, width // cell_width)
+        rows = (len(self._knobs) + self._columns - 1) // self._columns
+
+        self.SetVirtualSize((self._columns * cell_width, rows * cell_height))
+
+    def _get_knob_rect(self, index):
+        cell_width, cell_height = self._knob_size
+        row, column = divmod(index, self._columns)
+
+        return column * cell_width, row * cell_height, cell_width, cell_height
+
+    def _get_knobs_in(self, x, y, width, height):
+        """
+        Internal use, the knobs overlapping a box in unscrolled coordinates.
+        Only the rows and columns the box covers are looked at.
+        """
+        knobs = []
+
+        if not self._knobs or width <= 0 or height <= 0:
+            return knobs
+
+        cell_width, cell_height = self._knob_size
+        columns = self._columns
+
+        first_column = max(0, x // cell_width)
+        last_column = min(columns - 1, (x + width - 1) // cell_width)
+        first_row = max(0, y // cell_height)
+        last_row = (y + height - 1) // cell_height
+
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                index = row * columns + column
+
+                if index >= len(self._knobs):
+                    return knobs
+
+                knobs += [self._knobs[index]]
+
+        return knobs
+
+    def _invalidate_knob(self, knob, rect, source=None):
+        """
+        Internal use, marks an area of a knob as needing a repaint.
+
+        :param rect: wx.Rect in the coordinates of the knob, None for the
+            whole knob.
+        :param source: what caused the repaint, only used for instrumentation.
+        """
+        knob_x, knob_y, knob_width, knob_height = self._get_knob_rect(knob._index)
+
+        if rect is None:
+            x, y, width, height = 0, 0, knob_width, knob_height
+        else:
+            x, y, width, height = rect.Get()
+
+        x, y = self.CalcScrolledPosition(knob_x + x, knob_y + y)
+        client_width, client_height = self.GetClientSize()
+
+        # knobs out of the viewport get painted once they are scrolled in
+        if x >= client_width or y >= client_height or x + width <= 0 or y + height <= 0:
+            return
+
+        self._repaint.invalidate(wx.Rect(x, y, width, height), source)
+
+    def _to_knob(self, knob, x, y):
+        x, y = self.CalcUnscrolledPosition(x, y)
+        knob_x, knob_y = self._get_knob_rect(knob._index)[:2]
+
+        return x - knob_x, y - knob_y
+
+    def _on_erase_background(self, _):
+        pass
+
+    def _on_size(self, evt):
+        self._layout()
+
+        self._repaint.invalidate(source='size')
+        evt.Skip()
+
+    def _on_char_hook(self, evt):
+        knob = self._focus_knob
+
+        # keys the focused knob handles do not scroll the bank
+        if knob is not None and knob._key(evt.GetKeyCode()):
+            return
+
+        evt.Skip()
+
+    def _on_mouse_lost_capture(self, evt):
+        knob = self._drag_knob
+
+        if knob is not None:
+            knob._lost_capture()
+            self._drag_knob = None
+
+        evt.Skip()
+
+    def _on_mouse_wheel(self, evt):
+        x, y = evt.GetPosition()
+        knob = self.GetKnobAt(x, y)
+
+        # turning the wheel over a knob turns the knob instead of scrolling
+        if knob is not None and knob._wheel(evt.GetWheelRotation()):
+            return
+
+        evt.Skip()
+
+    def _on_mouse_left_up(self, evt):
+        knob = self._drag_knob
+
+        if knob is not None:
+            knob._release()
+
+        evt.Skip()
+
+    def _on_mouse_left_down(self, evt):
+        x, y = evt.GetPosition()
+        knob = self.GetKnobAt(x, y)
+
+        if knob is not None:
+            self._focus_knob = knob
+            knob._press(*self._to_knob(knob, x, y))
+
+        evt.Skip()
+
+    def _on_mouse_move(self, evt):
+        knob = self._drag_knob
+
+        if knob is not None:
+            x, y = evt.GetPosition()
+            knob._move(*self._to_knob(knob, x, y))
+
+        evt.Skip()
+
+    def OnPaint(self, _):
+        update_rect = self.GetUpdateRegion().GetBox()
+        background_colour = self.GetBackgroundColour()
+
+        pdc = wx.PaintDC(self)
+        gcdc = wx.GCDC(pdc)
+        gcdc.SetClippingRegion(update_rect)
+
+        gcdc.SetPen(wx.TRANSPARENT_PEN)
+        gcdc.SetBrush(resource_pool.get_brush(background_colour))
+        gcdc.DrawRectangle(*update_rect.Get())
+
+        view_x, view_y = self.CalcUnscrolledPosition(0, 0)
+        x, y, width, height = update_rect.Get()
+        x += view_x
+        y += view_y
+
+        # only the knobs inside of the damaged part of the viewport are drawn
+        for knob in self._get_knobs_in(x, y, width, height):
+            knob_x, knob_y, knob_width, knob_height = self._get_knob_rect(knob._index)
+
+            clip = wx.Rect(x - knob_x, y - knob_y, width, height)
+            clip = clip.Intersect(wx.Rect(0, 0, knob_width, knob_height))
+
+            if clip.width < knob_width or clip.height < knob_height:
+                clip = clip.Get()
+            else:
+                clip = None
+
+            instrumentation = knob._handler.instrumentation
+
+            if instrumentation is not None:
+                instrumentation.count('paint')
+                start = _clock()
+
+            bmp = knob._renderer.render(background_colour, clip)
+
+            if instrumentation is not None:
+                blit_start = _clock()
+
+            gcdc.DrawBitmap(bmp, knob_x - view_x, knob_y - view_y)
+
+            if instrumentation is not None:
+                now = _clock()
+                instrumentation.record('blit', now - blit_start)
+                instrumentation.record('paint', now - start)
+                instrumentation.maybe_export()
+
+            knob._on_painted()
+
+        gcdc.Destroy()
+        del gcdc
+
+        self._run_paint_callbacks()
+
+
+if __name__ == '__main__':
+
+    class Frame(wx.Frame):
+
+        def __init__(self):
+
+            wx.Frame.__init__(self, None, -1, size=(800, 600))
+
+            sizer = wx.BoxSizer(wx.VERTICAL)
+            bank = KnobBank(self, knobSize=(80, 80))
+            bank.SetBackgroundColour(wx.Colour(80, 80, 80))
+
+            # a 256 channel mixer
+            for _ in range(256):
+                knob = bank.AddKnob(value=0.0, minValue=0.0, maxValue=100.0, increment=1.0)
+                knob.SetThumbSize(7)
+                knob.SetTickFrequency(5.0)
+                knob.SetTickColours([(0, 255, 0, 255), (255, 187, 0, 255), (255, 0, 0, 255)])
+                knob.SetTickColourRanges([75.0, 90.0, 100.0])
+                knob.SetSecondaryColour((225, 225, 225, 255))
+                bank.Bind(wx.EVT_SCROLL_CHANGED, self.on_event, id=knob.GetId())
+
+            sizer.Add(bank, 1, wx.EXPAND)
+
+            self.SetSizer(sizer)
+
+        def on_event(self, event):
+            print(event.GetId(), event.GetPosition())
+
+    app = wx.App()
+
+    frame = Frame()
+    frame.Show()
+    app.MainLoop()
@@ -0,0 +1,1312 @@
+# -*- coding: utf-8 -*-
+"""
+Geometry model of the volume knob.
+
+Nothing in here depends on wxPython, the knob layout (radii, thumb orbit,
+tick end points and tick colour bands) can be computed without a display.
+Colours are plain (red, green, blue, alpha) tuples, wx objects are only
+created by the code that draws the knob.
+"""
+
+import math
+import time
+from array import array
+from collections import OrderedDict
+from fractions import Fraction
+from bisect import bisect_left, bisect_right
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+def frange(start, stop=None, step=1.0):
+    """
+    Range function that accepts floats
+    """
+
+    start = float(start)
+    step = float(step)
+
+    if stop is None:
+        stop, start = start, 0.0
+
+    count = int(math.ceil(stop - start) / step)
+    return iter(start + (n * step) for n in range(count))
+
+
+def _remap(value, old_min, old_max, new_min, new_max):
+    old_range = old_max - old_min
+    new_range = new_max - new_min
+
+    try:
+        return (
+            (((value - old_min) * new_range) / old_range) + new_min
+        )
+    except ZeroDivisionError:
+        return new_min
+
+
+# the knob sweeps clockwise from 135 degrees to 405 degrees
+SWEEP_START = 135.0
+SWEEP_STOP = 405.0
+
+_TICK_TABLE_LIMIT = 32
+_tick_tables = {}
+
+
+class _TickTable(object):
+    """
+    Steps that get a tick and the unit circle position of each tick.
+
+    Everything is counted in steps (increments above the minimum), a tick
+    sits on every `stride` step starting at `first`. The table only depends
+    on the number of steps and the tick spacing, so it is shared by every
+    knob using the same range and it survives a resize. With numpy the
+    positions are computed for all of the ticks at once.
+    """
+
+    def __init__(self, num_steps, first, stride):
+        self.first = first
+        self.stride = stride
+
+        if numpy is not None:
+            steps = numpy.arange(first, num_steps + 1, stride, dtype=numpy.int64)
+
+            if num_steps:
+                degrees = steps * (SWEEP_STOP - SWEEP_START) / num_steps + SWEEP_START
+            else:
+                degrees = numpy.full(len(steps), SWEEP_START)
+
+            radians = numpy.radians(degrees)
+            cos = numpy.cos(radians)
+            sin = numpy.sin(radians)
+
+            self.steps = steps.tolist()
+            self.cos = cos.tolist()
+            self.sin = sin.tolist()
+            self._arrays = (steps, cos, sin)
+            return
+
+        self.steps = list(range(first, num_steps + 1, stride))
+        self.cos = []
+        self.sin = []
+
+        for step in self.steps:
+            degree = _remap(step, 0, num_steps, SWEEP_START, SWEEP_STOP)
+            radian = math.radians(degree)
+
+            self.cos += [math.cos(radian)]
+            self.sin += [math.sin(radian)]
+
+        self._arrays = None
+
+    def get_slot(self, step):
+        """
+        Index of the tick on `step`, None if the step has no tick.
+        """
+        offset = step - self.first
+
+        if offset < 0 or offset % self.stride:
+            return None
+
+        slot = offset // self.stride
+
+        if slot >= len(self.steps):
+            return None
+
+        return slot
+
+    @property
+    def arrays(self):
+        """
+        The table as numpy arrays (steps, cos, sin).
+        """
+        if self._arrays is None:
+            self._arrays = (
+                numpy.array(self.steps, dtype=numpy.int64),
+                numpy.array(self.cos, dtype=numpy.float64),
+                numpy.array(self.sin, dtype=numpy.float64)
+            )
+        return self._arrays
+
+
+def _get_tick_table(num_steps, first, stride):
+    key = (num_steps, first, stride, SWEEP_START, SWEEP_STOP)
+
+    try:
+        return _tick_tables[key]
+    except KeyError:
+        pass
+
+    if len(_tick_tables) >= _TICK_TABLE_LIMIT:
+        _tick_tables.pop(next(iter(_tick_tables)))
+
+    table = _TickTable(num_steps, first, stride)
+    _tick_tables[key] = table
+    return table
+
+
+_grids = {}
+_GRID_LIMIT = 256
+
+
+def _exact(value):
+    # the decimal value as written, 0.1 is 1/10 and not the nearest double
+    return Fraction(repr(float(value)))
+
+
+def _gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return abs(a)
+
+
+def _mod_inverse(a, modulus):
+    old_r, r = a % modulus, modulus
+    old_s, s = 1, 0
+
+    while r:
+        quotient = old_r // r
+        old_r, r = r, old_r - quotient * r
+        old_s, s = s, old_s - quotient * s
+
+    return old_s % modulus
+
+
+def _get_grid(minimum, increment, size):
+    """
+    Steps whose value is a multiple of `size`, the steps a tick or a page
+    boundary sits on.
+
+    Step n has the value minimum + n * increment. The arithmetic is exact,
+    so a size that is not a multiple of the increment gets the steps that
+    land on a common multiple of both.
+
+    :return: (first, stride), the first step >= 0 and the number of steps
+        between two of them, None when no step has a multiple of `size`
+    """
+    key = (minimum, increment, size)
+
+    try:
+        return _grids[key]
+    except KeyError:
+        pass
+
+    minimum, increment, size = _exact(minimum), _exact(increment), _exact(size)
+
+    if increment <= 0 or size <= 0:
+        grid = None
+    else:
+        # scale everything to integers
+        scale = minimum.denominator * increment.denominator * size.denominator
+        minimum = int(minimum * scale)
+        increment = int(increment * scale)
+        size = int(size * scale)
+
+        # minimum + n * increment = 0 (mod size)
+        divisor = _gcd(increment, size)
+
+        if minimum % divisor:
+            grid = None
+        else:
+            stride = size // divisor
+            first = (-minimum // divisor) * _mod_inverse(increment // divisor, stride) % stride
+            grid = (first, stride)
+
+    if len(_grids) >= _GRID_LIMIT:
+        _grids.pop(next(iter(_grids)))
+
+    _grids[key] = grid
+    return grid
+
+
+_places = {}
+
+
+def _get_places(minimum, increment):
+    """
+    Decimal places of the values on a scale, minimum + n * increment has
+    no more of them than the minimum and the increment as written.
+    """
+    key = (minimum, increment)
+
+    try:
+        return _places[key]
+    except KeyError:
+        pass
+
+    places = 0
+
+    for value in (minimum, increment):
+        denominator = _exact(value).denominator
+
+        while 10 ** places % denominator:
+            places += 1
+
+    if len(_places) >= _GRID_LIMIT:
+        _places.pop(next(iter(_places)))
+
+    _places[key] = places
+    return places
+
+
+def clear_geometry_caches():
+    """
+    Drops the tick tables and step grids shared by every Handler, the
+    geometry of the next knob is built from scratch.
+    """
+    _tick_tables.clear()
+    _grids.clear()
+    _places.clear()
+
+
+def _colour_key(colour):
+    """
+    Returns a (red, green, blue, alpha) tuple for a colour sequence or for
+    any colour object with a wx.Colour like Get method.
+    """
+    get = getattr(colour, 'Get', None)
+
+    if get is not None:
+        colour = get(True)
+
+    colour = tuple(colour)
+
+    if len(colour) == 3:
+        colour += (255,)
+
+    return colour
+
+
+class LRUCache(object):
+    """
+    Mapping with a size budget that drops the least recently used entries
+    once the stored size goes over `max_bytes`.
+    """
+
+    def __init__(self, max_bytes):
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        self._max_bytes = value
+        self._trim()
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        if not total:
+            return 0.0
+        return self.hits / float(total)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        entries = self._entries
+
+        try:
+            entry = entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        entries[key] = entry
+        return entry[0]
+
+    def put(self, key, value, size):
+        entries = self._entries
+
+        old = entries.pop(key, None)
+        if old is not None:
+            self._size -= old[1]
+
+        entries[key] = (value, size)
+        self._size += size
+        self._trim()
+
+    def _trim(self):
+        entries = self._entries
+
+        while self._size > self._max_bytes and len(entries) > 1:
+            _, (_, size) = entries.popitem(last=False)
+            self._size -= size
+
+
+class Histogram(object):
+    """
+    Compact histogram of durations.
+
+    Durations are counted in power of two microsecond buckets, bucket n
+    holds the durations below 2 ** n microseconds that did not fit into
+    bucket n - 1. The last bucket also holds everything longer.
+    """
+
+    BUCKETS = 24
+
+    def __init__(self):
+        self.buckets = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def add(self, seconds):
+        microseconds = int(seconds * 1000000.0)
+        self.buckets[min(microseconds.bit_length(), self.BUCKETS - 1)] += 1
+
+        self.count += 1
+        self.total += seconds
+
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """
+        :param fraction: 0.0 - 1.0
+        :return: upper bound in seconds of the bucket the given fraction of
+            the durations falls into
+        """
+        if not self.count:
+            return 0.0
+
+        target = fraction * self.count
+        seen = 0
+
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return min(self.max, (2 ** bucket) / 1000000.0)
+
+        return self.max
+
+    def snapshot(self):
+        return dict(
+            count=self.count,
+            total=self.total,
+            mean=self.total / self.count if self.count else 0.0,
+            min=self.min or 0.0,
+            max=self.max,
+            p50=self.percentile(0.5),
+            p90=self.percentile(0.9),
+            p99=self.percentile(0.99),
+            buckets=list(self.buckets)
+        )
+
+
+class Instrumentation(object):
+    """
+    Opt-in timings and counters of a knob.
+
+    Stages record their durations into one Histogram per stage and events
+    are added up in `counters`. The caches in `caches` have their hit rates
+    included in the snapshots. While no instrumentation is attached the
+    instrumented code only pays for an `is None` check.
+
+    :param name: included in the snapshots to tell knobs apart.
+    :param callback: called with every exported snapshot.
+    :param interval: when set, `maybe_export` exports at most once every
+        `interval` seconds.
+    """
+
+    def __init__(self, name=None, callback=None, interval=None):
+        self.name = name
+        self.callback = callback
+        self.interval = interval
+        self.histograms = {}
+        self.counters = {}
+        self.caches = {}
+        self._last_export = _clock()
+
+    def record(self, stage, seconds):
+        try:
+            histogram = self.histograms[stage]
+        except KeyError:
+            histogram = self.histograms[stage] = Histogram()
+
+        histogram.add(seconds)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """
+        :return: dict with the name, the histogram of every stage, the
+            counters and the cache statistics, ready for json.dumps
+        """
+        caches = {}
+
+        for name, cache in self.caches.items():
+            if cache is not None:
+                caches[name] = dict(
+                    hits=cache.hits,
+                    misses=cache.misses,
+                    hit_rate=cache.hit_rate,
+                    entries=len(cache),
+                    size=cache.size
+                )
+
+        return dict(
+            name=self.name,
+            timings=dict((stage, histogram.snapshot()) for stage, histogram in self.histograms.items()),
+            counters=dict(self.counters),
+            caches=caches
+        )
+
+    def export(self):
+        """
+        Hands a snapshot to the callback.
+
+        :return: the snapshot
+        """
+        self._last_export = _clock()
+        snapshot = self.snapshot()
+
+        if self.callback is not None:
+            self.callback(snapshot)
+
+        return snapshot
+
+    def maybe_export(self):
+        if self.interval is not None and _clock() - self._last_export >= self.interval:
+            self.export()
+
+    def reset(self):
+        self.histograms.clear()
+        self.counters.clear()
+
+
+class Handler(object):
+
+    # a console can hold a thousand knobs, keep the instances small
+    __slots__ = (
+        'instrumentation',
+        '_size',
+        '_tick_geometry',
+        '_tick_bands',
+        '_range_index',
+        '_step',
+        '_value',
+        '_min_value',
+        '_max_value',
+        '_thumb_multiplier',
+        '_thumb_position',
+        '_thumb_radius',
+        '_radius',
+        '_thumb_orbit',
+        '_neon_radius',
+        '_foreground_colour',
+        '_background_colour',
+        '_tick_pen_width',
+        '_tick_table',
+        '_tick_steps',
+        '_tick_ranges',
+        '_tick_range_colours',
+        '_tick_frequency',
+        '_increment',
+        '_secondary_colour',
+        '_primary_colour',
+        '_page_size',
+        '_glow',
+        '_depression',
+        '_thumb_glow',
+        '_ticks',
+        '_shadow'
+    )
+
+    def __init__(self):
+        self.instrumentation = None
+        self._size = None
+        self._tick_geometry = None
+        self._tick_bands = None
+        self._range_index = None
+        self._step = None
+        self._value = None
+        self._min_value = None
+        self._max_value = None
+        self._thumb_multiplier = 0.04
+        self._thumb_position = None
+        self._thumb_radius = None
+        self._radius = None
+        self._thumb_orbit = None
+        self._neon_radius = None
+        self._foreground_colour = None
+        self._background_colour = None
+        self._tick_pen_width = 1.0
+        self._tick_table = None
+        self._tick_steps = None
+        self._tick_ranges = []
+        self._tick_range_colours = []
+        self._tick_frequency = 2.0
+        self._increment = 1.0
+        self._secondary_colour = (255, 255, 255, 255)
+        self._primary_colour = (33, 33, 33, 255)
+        self._page_size = None
+        self._glow = False
+        self._depression = False
+        self._thumb_glow = False
+        self._ticks = False
+        self._shadow = False
+
+    @property
+    def shadow(self):
+        return self._shadow
+
+    @shadow.setter
+    def shadow(self, value):
+        self._shadow = value
+
+    @property
+    def glow(self):
+        return self._glow
+
+    @glow.setter
+    def glow(self, value):
+        self._glow = value
+
+    @property
+    def depression(self):
+        return self._depression
+
+    @depression.setter
+    def depression(self, value):
+        self._depression = value
+
+    @property
+    def thumb_glow(self):
+        return self._thumb_glow
+
+    @thumb_glow.setter
+    def thumb_glow(self, value):
+        self._thumb_glow = value
+
+    @property
+    def primary_colour(self):
+        return self._primary_colour
+
+    @primary_colour.setter
+    def primary_colour(self, value):
+        self._primary_colour = _colour_key(value)
+
+    @property
+    def secondary_colour(self):
+        return self._secondary_colour
+
+    @secondary_colour.setter
+    def secondary_colour(self, value):
+        self._secondary_colour = _colour_key(value)
+
+    @property
+    def foreground_colour(self):
+        return self._foreground_colour
+
+    @foreground_colour.setter
+    def foreground_colour(self, value):
+        self._tick_bands = None
+        self._foreground_colour = _colour_key(value)
+
+    @property
+    def background_colour(self):
+        return self._background_colour
+
+    @background_colour.setter
+    def background_colour(self, value):
+        self._background_colour = _colour_key(value)
+
+    @property
+    def min_value(self):
+        return self._min_value
+
+    @min_value.setter
+    def min_value(self, value):
+        self._set_scale('_min_value', value)
+
+    @property
+    def max_value(self):
+        return self._max_value
+
+    @max_value.setter
+    def max_value(self, value):
+        self._set_scale('_max_value', value)
+
+    def _set_scale(self, name, value):
+        # the value is kept as a step number, re-express it after the
+        # minimum, maximum or increment changed
+        old_value = self.value
+
+        self._thumb_position = None
+        self._tick_geometry = None
+        self._tick_bands = None
+        self._range_index = None
+        setattr(self, name, value)
+
+        self._step = None
+        self._value = None
+
+        if old_value is not None:
+            self.value = old_value
+
+    @property
+    def size(self):
+        return self._size
+
+    @size.setter
+    def size(self, value):
+        self._radius = None
+        self._thumb_radius = None
+        self._neon_radius = None
+        self._thumb_orbit = None
+        self._thumb_position = None
+        self._tick_geometry = None
+        self._tick_bands = None
+        self._size = value
+
+    @property
+    def center(self):
+        width, height = self.size
+
+        return int(width / 2), int(height / 2)
+
+    @property
+    def radius(self):
+        if self._radius is None:
+            width, height = self.size
+            radius = (min(width, height) // 2) * 0.75
+            self._radius = radius
+
+        return self._radius
+
+    @property
+    def value(self):
+        if self._step is None:
+            return self._value
+
+        return self.step_to_value(self._step)
+
+    @value.setter
+    def value(self, value):
+        if self._min_value is None or not self._increment:
+            # held until there is a scale to turn it into a step
+            self._thumb_position = None
+            self._value = value
+            return
+
+        self.step = self.value_to_step(value)
+
+    @property
+    def step(self):
+        """
+        The value as the number of increments above the minimum.
+        """
+        return self._step
+
+    @step.setter
+    def step(self, step):
+        old_step = self._step
+        self._thumb_position = None
+        self._step = step
+        self._value = None
+
+        # only the ticks between the old and the new value change colour
+        if self._tick_bands is not None and old_step is not None:
+            self._recolour_ticks(old_step, step)
+
+    @property
+    def num_steps(self):
+        """
+        Number of whole increments between the minimum and the maximum, the
+        last step is below the maximum when the increment does not divide
+        the range.
+        """
+        return int(math.floor((self.max_value - self.min_value) / self.increment + 1e-9))
+
+    def value_to_step(self, value):
+        step = int(round((value - self.min_value) / self.increment))
+        return max(0, min(self.num_steps, step))
+
+    def step_to_value(self, step):
+        # rounded to the places of the scale, 3 steps of 0.1 are 0.3 and
+        # not 0.30000000000000004
+        return round(
+            self.min_value + step * self.increment,
+            _get_places(self.min_value, self.increment)
+        )
+
+    def get_grid(self, size):
+        """
+        Steps whose value is a multiple of `size`, see `_get_grid`.
+        """
+        return _get_grid(self.min_value, self.increment, size)
+
+    @property
+    def page_grid(self):
+        return self.get_grid(self.page_size)
+
+    def _get_page_steps(self):
+        # page length in steps for a range no step of which is a page boundary
+        return max(1, int(round(self.page_size / self.increment)))
+
+    def get_page_up_step(self):
+        """
+        Step of the next page boundary above the value.
+        """
+        grid = self.page_grid
+
+        if grid is None:
+            return self.step + self._get_page_steps()
+
+        first, stride = grid
+
+        if self.step < first:
+            return first
+
+        return first + ((self.step - first) // stride + 1) * stride
+
+    def get_page_down_step(self):
+        """
+        Step of the page boundary below the value, or of the one before it
+        if the value is on a page boundary.
+        """
+        grid = self.page_grid
+
+        if grid is None:
+            return self.step - self._get_page_steps()
+
+        first, stride = grid
+
+        return first + ((self.step - first - 1) // stride) * stride
+
+    @property
+    def neon_radius(self):
+        if self._neon_radius is None:
+            radius = self.radius
+            self._neon_radius = radius - 1
+
+        return self._neon_radius
+
+    @property
+    def thumb_multiplier(self):
+        return self._thumb_multiplier
+
+    @thumb_multiplier.setter
+    def thumb_multiplier(self, value):
+        self._thumb_radius = None
+        self._thumb_orbit = None
+        self._thumb_position = None
+        self._thumb_multiplier = value
+
+    @property
+    def thumb_radius(self):
+        if self._thumb_radius is None:
+            radius = self.radius
+            self._thumb_radius = radius * self.thumb_multiplier
+
+        return self._thumb_radius
+
+    @property
+    def thumb_orbit(self):
+        if self._thumb_orbit is None:
+            radius = self.radius
+            center_radius = self.center_radius
+            self._thumb_orbit = int(round((radius - center_radius) / 2.0)) + center_radius
+
+        return self._thumb_orbit
+
+    @property
+    def neon_colour(self):
+        """
+        Colour of the tick range the value falls into, the last tick range
+        colour once the value is past all of them.
+        """
+        colours = self.tick_range_colors
+
+        if not colours:
+            return tuple(self.foreground_colour[:3])
+
+        range_steps, _ = self.range_index
+        band = bisect_left(range_steps, self.step)
+
+        return tuple(colours[min(band, len(colours) - 1)][:3])
+
+    @property
+    def center_radius(self):
+        thumb_radius = self.thumb_radius
+
+        return self.radius - (thumb_radius * 2) - (self.radius * 0.1)
+
+    @property
+    def thumb_position(self):
+        if self._thumb_position is None:
+            width, height = self.size
+
+            x_center = width // 2
+            y_center = height // 2
+
+            thumb_orbit = self.thumb_orbit
+            thumb_degree = _remap(self.step, 0, self.num_steps, SWEEP_START, SWEEP_STOP)
+            thumb_radian = math.radians(thumb_degree)
+
+            cos = math.cos(thumb_radian)
+            sin = math.sin(thumb_radian)
+
+            thumb_x = x_center + int(round(thumb_orbit * cos))
+            thumb_y = y_center + int(round(thumb_orbit * sin))
+
+            self._thumb_position = (thumb_x, thumb_y)
+
+        return self._thumb_position
+
+    @property
+    def tick_range_colors(self):
+        return self._tick_range_colours
+
+    @tick_range_colors.setter
+    def tick_range_colors(self, value):
+        self._tick_bands = None
+        self._range_index = None
+        self._tick_range_colours = [_colour_key(colour) for colour in value]
+
+    @property
+    def tick_ranges(self):
+        return self._tick_ranges
+
+    @tick_ranges.setter
+    def tick_ranges(self, value):
+        self._tick_bands = None
+        self._range_index = None
+        self._tick_ranges = list(value)
+
+    @property
+    def range_index(self):
+        """
+        The tick ranges as (range_steps, bands), sorted by the last step
+        that falls into each range.
+
+        `bands[i]` is the index into `tick_range_colors` of the range ending
+        at `range_steps[i]`, -1 if that range has no colour.
+        """
+        if self._range_index is None:
+            num_colours = len(self.tick_range_colors)
+
+            ranges = sorted(
+                (int(math.floor((tick_range - self.min_value) / self.increment + 1e-9)), band)
+                for band, tick_range in enumerate(self.tick_ranges)
+            )
+
+            self._range_index = (
+                [range_step for range_step, _ in ranges],
+                [band if band < num_colours else -1 for _, band in ranges]
+            )
+
+        return self._range_index
+
+    @property
+    def increment(self):
+        return self._increment
+
+    @increment.setter
+    def increment(self, value):
+        self._set_scale('_increment', value)
+
+    @property
+    def tick_frequency(self):
+        return self._tick_frequency
+
+    @tick_frequency.setter
+    def tick_frequency(self, value):
+        self._tick_geometry = None
+        self._tick_bands = None
+        self._tick_frequency = value
+
+    @property
+    def page_size(self):
+        if self._page_size is None:
+            return (self.max_value - self.min_value) / 10.0
+        return self._page_size
+
+    @page_size.setter
+    def page_size(self, value):
+        self._page_size = value
+        self._tick_geometry = None
+        self._tick_bands = None
+
+    @property
+    def ticks(self):
+        return self._ticks
+
+    @ticks.setter
+    def ticks(self, value):
+        self._ticks = value
+
+    @property
+    def tick_geometry(self):
+        """
+        Tick values and line coordinates.
+
+        The geometry only depends on the size, value range, increment,
+        page size and tick frequency, it is not rebuilt when the value or
+        the tick colours change.
+
+        The values are an array('d') and the coordinates a flat array('i')
+        holding x1, y1, x2, y2 for every tick. When numpy is available the
+        coordinates are computed in one go from the cached tick table,
+        straight into the array.
+
+        :return: tuple of (values, coords)
+        """
+        if self._tick_geometry is None:
+            instrumentation = self.instrumentation
+
+            if instrumentation is not None:
+                start = _clock()
+
+            width, height = self.size
+            center = int(round(min(width, height) / 2.0))
+
+            center_x = int(round(width / 2.0))
+            center_y = int(round(height / 2.0))
+
+            large_outside_radius = center - int(round(center * 0.05))
+            inside_radius = int(round(large_outside_radius * 0.90))
+            small_outside_radius = int(round(self.radius * 1.20))
+
+            num_small_ticks = int(round((self.max_value - self.min_value) / self.tick_frequency)) + 1
+            num_large_ticks = int(round((self.max_value - self.min_value) / self.page_size)) + 1
+            num_small_ticks -= num_large_ticks
+
+            # values that are a multiple of num_large_ticks - 1 increments
+            # get a large tick
+            if num_large_ticks > 1:
+                large_grid = self.get_grid((num_large_ticks - 1) * self.increment)
+            else:
+                large_grid = (0, 1)
+
+            if large_grid is None:
+                large_first, large_stride = self.num_steps + 1, 1
+            else:
+                large_first, large_stride = large_grid
+
+            self._tick_pen_width = max(1.0, (center * 0.015) - (num_small_ticks / 100.0))
+
+            # a tick on every value that is a multiple of the tick frequency
+            tick_grid = self.get_grid(self.tick_frequency)
+
+            if tick_grid is None:
+                tick_grid = (self.num_steps + 1, 1)
+
+            table = _get_tick_table(self.num_steps, *tick_grid)
+            self._tick_table = table
+            self._tick_steps = steps = table.steps
+
+            if numpy is not None and steps:
+                step_array, cos, sin = table.arrays
+
+                # rounded to the places of the scale, see step_to_value
+                values = array('d', [0.0]) * len(steps)
+                numpy.frombuffer(values, dtype=numpy.float64)[:] = numpy.round(
+                    self.min_value + step_array * self.increment,
+                    _get_places(self.min_value, self.increment)
+                )
+
+                outside_radius = numpy.where(
+                    (step_array < large_first) | ((step_array - large_first) % large_stride != 0),
+                    small_outside_radius,
+                    large_outside_radius
+                )
+
+                coords = array('i', [0]) * (len(values) * 4)
+                view = numpy.frombuffer(coords, dtype=numpy.intc).reshape(-1, 4)
+
+                # numpy.rint rounds half to even, the same as round()
+                view[:, 0] = numpy.rint(outside_radius * cos) + center_x
+                view[:, 1] = numpy.rint(outside_radius * sin) + center_y
+                view[:, 2] = numpy.rint(inside_radius * cos) + center_x
+                view[:, 3] = numpy.rint(inside_radius * sin) + center_y
+
+            else:
+                values = array('d', [self.step_to_value(step) for step in steps])
+                coords = array('i')
+
+                for step, cos, sin in zip(steps, table.cos, table.sin):
+                    x2 = center_x + int(round(inside_radius * cos))
+                    y2 = center_y + int(round(inside_radius * sin))
+
+                    if step < large_first or (step - large_first) % large_stride:
+                        x1 = center_x + int(round(small_outside_radius * cos))
+                        y1 = center_y + int(round(small_outside_radius * sin))
+                    else:
+                        x1 = center_x + int(round(large_outside_radius * cos))
+                        y1 = center_y + int(round(large_outside_radius * sin))
+
+                    coords.extend((x1, y1, x2, y2))
+
+            self._tick_geometry = (values, coords)
+
+            if instrumentation is not None:
+                instrumentation.record('geometry', _clock() - start)
+
+        return self._tick_geometry
+
+    @property
+    def tick_values(self):
+        return self.tick_geometry[0]
+
+    @property
+    def tick_steps(self):
+        """
+        The step number of each tick.
+        """
+        _ = self.tick_geometry
+        return self._tick_steps
+
+    @property
+    def tick_coords(self):
+        """
+        Flat array('i') of x1, y1, x2, y2 for every tick.
+        """
+        return self.tick_geometry[1]
+
+    def get_tick_line(self, index):
+        """
+        :return: (x1, y1, x2, y2) of the tick at `index`
+        """
+        start = index * 4
+        return tuple(self.tick_coords[start:start + 4])
+
+    @property
+    def tick_pen_width(self):
+        _ = self.tick_geometry
+        return self._tick_pen_width
+
+    @property
+    def tick_bands(self):
+        """
+        The colour band of each tick, in the same order as `tick_values`.
+
+        A band is an index into `tick_range_colors`, -1 is the foreground
+        colour. The bands are kept in an array('h').
+        """
+        if self._tick_bands is None:
+            steps = self.tick_steps
+            instrumentation = self.instrumentation
+
+            if instrumentation is not None:
+                start = _clock()
+
+            self._tick_bands = array('h', [self._get_tick_band(step) for step in steps])
+
+            if instrumentation is not None:
+                instrumentation.record('bands', _clock() - start)
+
+        return self._tick_bands
+
+    def get_band_colour(self, band):
+        if band < 0:
+            return self.foreground_colour
+        return self.tick_range_colors[band]
+
+    @property
+    def tick_list(self):
+        """
+        One [value, colour, [x1, y1, x2, y2]] list per tick.
+        """
+        get_band_colour = self.get_band_colour
+        coords = iter(self.tick_coords)
+
+        return [
+            [i, get_band_colour(band), [x1, y1, x2, y2]] for i, band, x1, y1, x2, y2 in
+            zip(self.tick_values, self.tick_bands, coords, coords, coords, coords)
+        ]
+
+    def _get_tick_band(self, tick_step):
+        if tick_step > self.step:
+            return -1
+
+        range_steps, bands = self.range_index
+        index = bisect_left(range_steps, tick_step)
+
+        if index < len(bands):
+            return bands[index]
+
+        return -1
+
+    def _recolour_ticks(self, old_step, new_step):
+        steps = self.tick_steps
+        bands = self._tick_bands
+
+        start = bisect_right(steps, min(old_step, new_step))
+        stop = bisect_right(steps, max(old_step, new_step))
+
+        for index in range(start, stop):
+            bands[index] = self._get_tick_band(steps[index])
+
+    @property
+    def render_key(self):
+        """
+        Everything other than the value that changes how the knob looks.
+        """
+        return (
+            tuple(self.size),
+            self.primary_colour,
+            self.secondary_colour,
+            self.foreground_colour,
+            tuple(self.tick_range_colors),
+            tuple(self.tick_ranges),
+            self.min_value,
+            self.max_value,
+            self.increment,
+            self.tick_frequency,
+            self.page_size,
+            self.thumb_multiplier,
+            self.glow,
+            self.depression,
+            self.thumb_glow,
+            self.ticks,
+            self.shadow
+        )
+
+    @property
+    def thumb_box(self):
+        """
+        Box covering the thumb and the thumb glow.
+
+        :return: tuple of (x, y, width, height)
+        """
+        thumb_x, thumb_y = self.thumb_position
+        radius = self.thumb_radius
+
+        if self.thumb_glow:
+            radius *= 2
+
+        # a couple of pixels for the anti aliasing
+        radius = int(math.ceil(radius)) + 2
+
+        return thumb_x - radius, thumb_y - radius, radius * 2, radius * 2
+
+    def get_tick_box(self, value_a, value_b):
+        """
+        Box covering the ticks that change colour when the value moves
+        between `value_a` and `value_b`.
+
+        :return: tuple of (x, y, width, height) or None if no ticks change
+        """
+        steps = self.tick_steps
+        coords = self.tick_coords
+        step_a = self.value_to_step(value_a)
+        step_b = self.value_to_step(value_b)
+
+        start = bisect_right(steps, min(step_a, step_b))
+        stop = bisect_right(steps, max(step_a, step_b))
+
+        if start == stop:
+            return None
+
+        span = coords[start * 4:stop * 4]
+        xs = span[0::2]
+        ys = span[1::2]
+
+        pad = int(math.ceil(self._tick_pen_width)) + 1
+        x, y = min(xs) - pad, min(ys) - pad
+
+        return x, y, max(xs) + pad - x, max(ys) + pad - y
+
+    def get_step(self, value):
+        """
+        Number of increments `value` is above the minimum, None when the
+        value does not sit on an increment.
+        """
+        steps = (value - self.min_value) / self.increment
+        step = int(round(steps))
+
+        if abs(steps - step) > 1e-6:
+            return None
+
+        return step
+
+    def get_tick_slot(self, value):
+        """
+        Index of the tick drawn for `value`, None if there is no tick for it.
+        """
+        _ = self.tick_geometry
+
+        step = self.get_step(value)
+        if step is None:
+            return None
+
+        return self._tick_table.get_slot(step)
+
+    def is_value_line_up(self, value):
+        if value < self.value:
+            return False
+
+        i = self.get_tick_slot(value)
+        if i is None:
+            return False
+
+        if i == len(self.tick_steps) - 1:
+            return False
+        if self.get_tick_line(i + 1) != self.get_tick_line(i):
+            return True
+
+        return False
+
+    def is_value_line_down(self, value):
+        if value > self.value:
+            return False
+
+        i = self.get_tick_slot(value)
+        if i is None:
+            return False
+
+        if i == 0:
+            return False
+        if self.get_tick_line(i - 1) != self.get_tick_line(i):
+            return True
+
+        return False
+
+    def is_page(self, value):
+        return self.is_page_step(self.value_to_step(value))
+
+    def is_page_step(self, step):
+        grid = self.page_grid
+
+        if grid is None:
+            return False
+
+        first, stride = grid
+
+        if (step - first) % stride:
+            return False
+        return True
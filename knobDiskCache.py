@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Frame cache that keeps rendered knob frames on disk between runs.
+
+Frames are stored as raw RGBA pixels in a single file that is memory mapped
+when the cache is opened, a knob whose frame is in the file is blitted from
+it on its first paint instead of being rendered
+
+    cache = DiskFrameCache('knobs.cache')
+    ctrl.SetFrameCache(cache)
+    ...
+    cache.save()
+
+Frames are keyed by a hash of the frame cache key, which holds the full
+render configuration of a knob (size, colours, knob style, value range and
+tick settings) and the position of its value. The file also records a hash
+of the render code and the wx version, a file written by other render code
+is ignored and replaced by the next `save`.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from collections import OrderedDict
+
+import wx
+
+import knobCore
+import wxVolumeCtrl
+from wxVolumeCtrl import FrameCache
+
+# bump when the file layout changes
+FORMAT_VERSION = 1
+
+_MAGIC = b'KNOBFRMS'
+_HEADER = struct.Struct('<8sI20sI')
+_ENTRY = struct.Struct('<20sQII')
+
+
+def _get_render_version():
+    """
+    Hash of everything that changes how a frame looks, the source of the
+    modules that draw the knob and the wx version.
+    """
+    digest = hashlib.sha1()
+    digest.update(str(FORMAT_VERSION).encode('ascii'))
+    digest.update(wx.version().encode('ascii'))
+
+    for module in (knobCore, wxVolumeCtrl, wxVolumeCtrl.knobRaster):
+        if module is None:
+            continue
+
+        path = os.path.splitext(getattr(module, '__file__', ''))[0] + '.py'
+
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except (IOError, OSError):
+            # frozen applications do not ship the source
+            digest.update(module.__name__.encode('ascii'))
+
+    return digest.digest()
+
+
+def _get_key_digest(key):
+    return hashlib.sha1(repr(key).encode('utf-8')).digest()
+
+
+class DiskFrameCache(FrameCache):
+    """
+    FrameCache backed by a memory mapped file.
+
+    Frames rendered while the cache is in use are kept in memory and written
+    to the file by `save`. The most recently used frames are kept when the
+    file would grow over `max_file_bytes`.
+
+    :param path: file the frames are kept in, it does not need to exist.
+    :param max_bytes: budget for the frames held as bitmaps in memory.
+    :param max_file_bytes: budget for the pixel data in the file.
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, max_file_bytes=256 * 1024 * 1024):
+        FrameCache.__init__(self, max_bytes)
+        self._path = path
+        self._max_file_bytes = max_file_bytes
+        self._render_version = _get_render_version()
+        self._file = None
+        self._map = None
+        self._index = {}
+        self._pending = OrderedDict()
+        self._pending_bytes = 0
+        self._used = {}
+        self._clock = 0
+        self.disk_hits = 0
+
+        self._open()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def max_file_bytes(self):
+        return self._max_file_bytes
+
+    @max_file_bytes.setter
+    def max_file_bytes(self, value):
+        self._max_file_bytes = value
+
+    @property
+    def file_entries(self):
+        """
+        Number of frames in the file.
+        """
+        return len(self._index)
+
+    def _open(self):
+        self._index = {}
+
+        try:
+            f = open(self._path, 'rb')
+        except (IOError, OSError):
+            return
+
+        try:
+            header = f.read(_HEADER.size)
+
+            if len(header) < _HEADER.size:
+                f.close()
+                return
+
+            magic, version, render_version, count = _HEADER.unpack(header)
+
+            if magic != _MAGIC or version != FORMAT_VERSION or render_version != self._render_version:
+                f.close()
+                return
+
+            data = f.read(_ENTRY.size * count)
+
+            if len(data) < _ENTRY.size * count:
+                f.close()
+                return
+
+            file_size = os.fstat(f.fileno()).st_size
+            index = {}
+
+            for i in range(count):
+                digest, offset, width, height = _ENTRY.unpack_from(data, i * _ENTRY.size)
+
+                # skip what a truncated file no longer holds
+                if offset + width * height * 4 <= file_size:
+                    index[digest] = (offset, width, height)
+
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError, struct.error):
+            f.close()
+            return
+
+        self._file = f
+        self._index = index
+
+    def close(self):
+        """
+        Unmaps the file, frames that were not saved are dropped.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        self._index = {}
+        self._pending.clear()
+        self._pending_bytes = 0
+        self._used.clear()
+
+    def _touch(self, digest):
+        # only the frames the next save can write are tracked
+        if digest in self._index or digest in self._pending:
+            self._clock += 1
+            self._used[digest] = self._clock
+
+    def get(self, key, default=None):
+        if key in self._entries:
+            return FrameCache.get(self, key)
+
+        digest = _get_key_digest(key)
+
+        try:
+            offset, width, height = self._index[digest]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        size = width * height * 4
+        bmp = wx.Bitmap.FromBufferRGBA(width, height, self._map[offset:offset + size])
+
+        self.hits += 1
+        self.disk_hits += 1
+        self._touch(digest)
+        FrameCache.put(self, key, bmp, size)
+
+        return bmp
+
+    def put(self, key, value, size):
+        FrameCache.put(self, key, value, size)
+
+        digest = _get_key_digest(key)
+
+        if digest in self._index or digest in self._pending:
+            self._touch(digest)
+            return
+
+        width, height = value.GetWidth(), value.GetHeight()
+        data = bytearray(width * height * 4)
+        value.CopyToBuffer(data, wx.BitmapBufferFormat_RGBA)
+
+        self._pending[digest] = (width, height, data)
+        self._pending_bytes += len(data)
+        self._touch(digest)
+
+        # unsaved frames never take more than the file could hold
+        while self._pending_bytes > self._max_file_bytes and len(self._pending) > 1:
+            old_digest, (_, _, old) = self._pending.popitem(last=False)
+            self._pending_bytes -= len(old)
+            self._used.pop(old_digest, None)
+
+    def save(self):
+        """
+        Writes the frames of the file and the frames rendered since it was
+        opened to the file, the most recently used first until the file is
+        full.
+        """
+        # the frames still held in memory were used last, in LRU order
+        for key in self._entries:
+            self._touch(_get_key_digest(key))
+
+        digests = set(self._index)
+        digests.update(self._pending)
+
+        # frames used in this run first, the rest in the order of the file
+        ordered = sorted(
+            digests,
+            key=lambda digest: (-self._used.get(digest, 0), self._index.get(digest, (0,))[0])
+        )
+
+        entries = []
+        total = 0
+
+        for digest in ordered:
+            if digest in self._pending:
+                width, height, _ = self._pending[digest]
+            else:
+                _, width, height = self._index[digest]
+
+            size = width * height * 4
+
+            if total + size > self._max_file_bytes:
+                continue
+
+            entries += [(digest, width, height)]
+            total += size
+
+        temp_path = self._path + '.tmp'
+        offset = _HEADER.size + _ENTRY.size * len(entries)
+
+        with open(temp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, FORMAT_VERSION, self._render_version, len(entries)))
+
+            for digest, width, height in entries:
+                f.write(_ENTRY.pack(digest, offset, width, height))
+                offset += width * height * 4
+
+            for digest, width, height in entries:
+                if digest in self._pending:
+                    f.write(self._pending[digest][2])
+                else:
+                    start = self._index[digest][0]
+                    f.write(self._map[start:start + width * height * 4])
+
+        # the old file can only be replaced once it is no longer mapped
+        self.close()
+
+        if hasattr(os, 'replace'):
+            os.replace(temp_path, self._path)
+        else:
+            # Python 2 can not rename over an existing file on Windows
+            if sys.platform == 'win32' and os.path.exists(self._path):
+                os.remove(self._path)
+
+            os.rename(temp_path, self._path)
+
+        self._open()
@@ -0,0 +1,484 @@
+# -*- coding: utf-8 -*-
+"""
+Software rasterizer for the volume knob, needs numpy.
+
+Draws the same knob as the wx.GraphicsContext renderer (shadow, glow, body,
+depression, thumb, thumb glow and anti-aliased ticks) from the geometry of
+a `Handler` into an (height, width, 4) uint8 RGBA array. Nothing in here
+touches wx, so frames can be rendered in worker threads or processes and
+handed to the GUI thread as plain arrays
+
+    raster = RasterRenderer(handler)
+    rgba = raster.render((80, 80, 80))
+
+    # on the GUI thread
+    bmp = wx.Bitmap.FromBufferRGBA(width, height, rgba)
+
+A Handler is not thread safe, a worker renders from a Handler of its own.
+
+Drawing is done in premultiplied float32 and follows cairo: radial
+gradients run between a focal point and a circle and are padded past their
+ends, gradient colours are interpolated without premultiplication and
+edges get one pixel of coverage based anti-aliasing.
+"""
+
+import math
+
+import numpy
+
+from knobCore import _colour_key
+
+
+_TRANSPARENT = (0, 0, 0, 0)
+
+
+def _premultiply(colour):
+    red, green, blue, alpha = _colour_key(colour)
+    alpha /= 255.0
+
+    return numpy.array(
+        [red / 255.0 * alpha, green / 255.0 * alpha, blue / 255.0 * alpha, alpha],
+        dtype=numpy.float32
+    )
+
+
+class RadialGradient(object):
+    """
+    Radial gradient from the focal point (xo, yo) to the circle around
+    (xc, yc), the arguments of wx.GraphicsRenderer.CreateRadialGradientBrush.
+
+    :param stops: sequence of (colour, position) pairs between the start and
+        the end colour.
+    """
+
+    def __init__(self, xo, yo, xc, yc, radius, start_colour, end_colour, stops=()):
+        self.xo = xo
+        self.yo = yo
+        self.xc = xc
+        self.yc = yc
+        self.radius = radius
+
+        stops = sorted(
+            [(0.0, _colour_key(start_colour))] +
+            [(pos, _colour_key(colour)) for colour, pos in stops] +
+            [(1.0, _colour_key(end_colour))],
+            key=lambda stop: stop[0]
+        )
+
+        self._positions = numpy.array([pos for pos, _ in stops], dtype=numpy.float32)
+        self._colours = numpy.array([colour for _, colour in stops], dtype=numpy.float32) / 255.0
+
+    def __call__(self, xs, ys):
+        """
+        :param xs: x of the pixel centers
+        :param ys: y of the pixel centers
+        :return: premultiplied colours, shape of xs + (4,)
+        """
+        dx = self.xc - self.xo
+        dy = self.yc - self.yo
+        qx = xs - self.xo
+        qy = ys - self.yo
+
+        # t of the circle, moving from the focal point to the end circle,
+        # that passes through the pixel: |q - t * d| = t * radius
+        a = dx * dx + dy * dy - self.radius * self.radius
+        b = qx * dx + qy * dy
+        c = qx * qx + qy * qy
+
+        if abs(a) < 1e-9:
+            t = c / numpy.maximum(2.0 * b, 1e-9)
+        else:
+            root = numpy.sqrt(numpy.maximum(b * b - a * c, 0.0))
+            t = numpy.maximum((b + root) / a, (b - root) / a)
+
+        t = numpy.clip(t, 0.0, 1.0)
+
+        colours = numpy.empty(t.shape + (4,), dtype=numpy.float32)
+
+        for channel in range(4):
+            colours[..., channel] = numpy.interp(t, self._positions, self._colours[:, channel])
+
+        colours[..., :3] *= colours[..., 3:]
+        return colours
+
+
+class Canvas(object):
+    """
+    Premultiplied float32 RGBA pixels of the part of a frame at (x, y).
+    """
+
+    def __init__(self, pixels, x=0, y=0):
+        self.pixels = pixels
+        self.x = x
+        self.y = y
+
+    def _get_box(self, left, top, right, bottom):
+        height, width = self.pixels.shape[:2]
+
+        left = max(int(math.floor(left)) - self.x, 0)
+        top = max(int(math.floor(top)) - self.y, 0)
+        right = min(int(math.ceil(right)) - self.x, width)
+        bottom = min(int(math.ceil(bottom)) - self.y, height)
+
+        if left >= right or top >= bottom:
+            return None
+
+        return left, top, right, bottom
+
+    def _get_centers(self, box):
+        left, top, right, bottom = box
+
+        xs = numpy.arange(left, right, dtype=numpy.float32) + (self.x + 0.5)
+        ys = numpy.arange(top, bottom, dtype=numpy.float32) + (self.y + 0.5)
+
+        return numpy.meshgrid(xs, ys)
+
+    def fill(self, colour):
+        self.pixels[...] = _premultiply(colour)
+
+    def composite(self, box, paint, coverage):
+        """
+        Draws `paint`, a premultiplied colour or an array of them, over the
+        pixels in `box` with the given coverage.
+        """
+        left, top, right, bottom = box
+        target = self.pixels[top:bottom, left:right]
+
+        source = paint * coverage[..., None]
+        target *= 1.0 - source[..., 3:]
+        target += source
+
+    def fill_circle(self, x, y, r, paint):
+        """
+        Fills a circle the way `_draw_circle` draws it through a GCDC, the
+        circle is snapped to the integer box around it.
+
+        :param paint: premultiplied colour or a callable returning the
+            colours for arrays of pixel centers, like RadialGradient.
+        """
+        left = int(round(float(x) - r))
+        top = int(round(float(y) - r))
+        size = int(round(r * 2.0))
+
+        if size <= 0:
+            return
+
+        radius = size / 2.0
+        center_x = left + radius
+        center_y = top + radius
+
+        box = self._get_box(left - 1, top - 1, left + size + 1, top + size + 1)
+
+        if box is None:
+            return
+
+        xs, ys = self._get_centers(box)
+        distance = numpy.hypot(xs - center_x, ys - center_y)
+        coverage = numpy.clip(radius + 0.5 - distance, 0.0, 1.0)
+
+        if callable(paint):
+            paint = paint(xs, ys)
+
+        self.composite(box, paint, coverage)
+
+    def stroke_lines(self, lines, width, colour):
+        """
+        Strokes line segments with round caps as a single path, pixels where
+        segments overlap are only drawn once.
+
+        :param lines: (n, 4) array of x1, y1, x2, y2
+        """
+        if not len(lines):
+            return
+
+        lines = numpy.asarray(lines, dtype=numpy.float32)
+        half_width = width / 2.0
+        reach = half_width + 1.0
+
+        height, canvas_width = self.pixels.shape[:2]
+
+        # segments that can not reach the canvas, all but a few of them on a
+        # clipped render, are dropped before anything is rasterized
+        x1, y1, x2, y2 = lines[:, 0], lines[:, 1], lines[:, 2], lines[:, 3]
+        lefts = numpy.floor(numpy.minimum(x1, x2) - reach).astype(numpy.int32)
+        tops = numpy.floor(numpy.minimum(y1, y2) - reach).astype(numpy.int32)
+        rights = numpy.ceil(numpy.maximum(x1, x2) + reach).astype(numpy.int32)
+        bottoms = numpy.ceil(numpy.maximum(y1, y2) + reach).astype(numpy.int32)
+
+        visible = (
+            (rights > self.x) & (lefts < self.x + canvas_width) &
+            (bottoms > self.y) & (tops < self.y + height)
+        )
+
+        if not visible.any():
+            return
+
+        if not visible.all():
+            lines = lines[visible]
+            x1, y1, x2, y2 = lines[:, 0], lines[:, 1], lines[:, 2], lines[:, 3]
+            lefts, tops = lefts[visible], tops[visible]
+            rights, bottoms = rights[visible], bottoms[visible]
+
+        # every segment is rasterized in a patch the size of the largest one
+        patch_width = int(numpy.max(rights - lefts))
+        patch_height = int(numpy.max(bottoms - tops))
+
+        offsets_x = numpy.arange(patch_width, dtype=numpy.int32)
+        offsets_y = numpy.arange(patch_height, dtype=numpy.int32)
+
+        px = (lefts[:, None, None] + offsets_x[None, None, :]).repeat(patch_height, axis=1)
+        py = (tops[:, None, None] + offsets_y[None, :, None]).repeat(patch_width, axis=2)
+
+        # distance from each pixel center to its segment
+        dx = (x2 - x1)[:, None, None]
+        dy = (y2 - y1)[:, None, None]
+        length = numpy.maximum(dx * dx + dy * dy, 1e-9)
+
+        qx = px + 0.5 - x1[:, None, None]
+        qy = py + 0.5 - y1[:, None, None]
+        t = numpy.clip((qx * dx + qy * dy) / length, 0.0, 1.0)
+        distance = numpy.hypot(qx - t * dx, qy - t * dy)
+
+        coverage = numpy.clip(half_width + 0.5 - distance, 0.0, 1.0)
+
+        px -= self.x
+        py -= self.y
+
+        inside = (coverage > 0.0) & (px >= 0) & (px < canvas_width) & (py >= 0) & (py < height)
+
+        if not inside.any():
+            return
+
+        # union of the segments, the highest coverage of any segment wins
+        flat = numpy.zeros(height * canvas_width, dtype=numpy.float32)
+        numpy.maximum.at(flat, py[inside] * canvas_width + px[inside], coverage[inside])
+
+        self.composite(
+            (0, 0, canvas_width, height),
+            _premultiply(colour),
+            flat.reshape(height, canvas_width)
+        )
+
+
+class RasterRenderer(object):
+    """
+    Renders the knob described by a `Handler` into an RGBA array.
+
+    The background, the glow and the body only depend on the handler state
+    that does not change with the value, they are drawn once into a base
+    image that is kept until that state changes. The thumb, the thumb glow
+    and the ticks are drawn over a copy of it on every render.
+
+    Renders go into one array that is returned every time, a clipped render
+    only redraws the clipped part of it.
+    """
+
+    def __init__(self, handler):
+        self._handler = handler
+        self._base = None
+        self._base_key = None
+        self._frame = None
+
+    def invalidate(self):
+        """
+        Drops the base image.
+        """
+        self._base = None
+        self._base_key = None
+
+    def _get_base(self, background_colour):
+        handler = self._handler
+
+        key = (
+            tuple(handler.size),
+            _colour_key(background_colour),
+            handler.shadow,
+            handler.glow and tuple(handler.neon_colour),
+            handler.depression,
+            handler.thumb_multiplier,
+            handler.primary_colour,
+            handler.secondary_colour
+        )
+
+        if self._base_key == key:
+            return self._base
+
+        width, height = handler.size
+        canvas = Canvas(numpy.empty((height, width, 4), dtype=numpy.float32))
+        canvas.fill(background_colour)
+
+        x_center, y_center = handler.center
+        radius = handler.radius
+
+        if handler.shadow:
+            canvas.fill_circle(
+                x_center + (radius * 0.10),
+                y_center + (radius * 0.10),
+                radius * 2,
+                RadialGradient(
+                    x_center + (radius * 0.10),
+                    y_center + (radius * 0.10),
+                    x_center + (radius * 0.30),
+                    y_center + (radius * 0.30),
+                    radius * 2.3,
+                    (0, 0, 0, 255),
+                    _TRANSPARENT,
+                    ((_TRANSPARENT, 0.45), ((0, 0, 0, 255), 0.25))
+                )
+            )
+
+            canvas.fill_circle(x_center, y_center, radius - 2, _premultiply(background_colour))
+
+        if handler.glow:
+            canvas.fill_circle(
+                x_center,
+                y_center,
+                radius * 2,
+                RadialGradient(
+                    x_center,
+                    y_center,
+                    x_center,
+                    y_center,
+                    radius * 4,
+                    _TRANSPARENT,
+                    _TRANSPARENT,
+                    (
+                        (_TRANSPARENT, 0.265),
+                        (handler.neon_colour + (255,), 0.25),
+                        (_TRANSPARENT, 0.248)
+                    )
+                )
+            )
+
+        # outside ring of volume knob
+        canvas.fill_circle(
+            x_center,
+            y_center,
+            radius,
+            RadialGradient(
+                x_center - radius,
+                y_center - radius,
+                x_center,
+                y_center - radius,
+                radius * 2,
+                handler.secondary_colour,
+                handler.primary_colour
+            )
+        )
+
+        # inside of volume knob
+        if handler.depression:
+            center_radius = handler.center_radius
+
+            canvas.fill_circle(
+                x_center,
+                y_center,
+                center_radius,
+                RadialGradient(
+                    x_center + center_radius,
+                    y_center + center_radius,
+                    x_center,
+                    y_center + center_radius,
+                    center_radius * 2,
+                    handler.secondary_colour,
+                    handler.primary_colour
+                )
+            )
+
+        self._base = canvas.pixels
+        self._base_key = key
+
+        return self._base
+
+    def render(self, background_colour, clip=None):
+        """
+        Renders the knob.
+
+        :param background_colour: colour the knob is drawn over.
+        :param clip: optional (x, y, width, height) box, only the area inside
+            of it is drawn.
+        :return: (height, width, 4) uint8 array of RGBA pixels, it is drawn
+            over by the next render.
+        """
+        handler = self._handler
+        width, height = handler.size
+        base = self._get_base(background_colour)
+
+        if self._frame is None or self._frame.shape[:2] != (height, width):
+            self._frame = numpy.zeros((height, width, 4), dtype=numpy.uint8)
+            clip = None
+
+        if clip is None:
+            left, top, right, bottom = 0, 0, width, height
+        else:
+            x, y, clip_width, clip_height = clip
+            left, top = max(x, 0), max(y, 0)
+            right, bottom = min(x + clip_width, width), min(y + clip_height, height)
+
+            if left >= right or top >= bottom:
+                return self._frame
+
+        canvas = Canvas(base[top:bottom, left:right].copy(), left, top)
+
+        thumb_x, thumb_y = handler.thumb_position
+        thumb_radius = handler.thumb_radius
+
+        # handle of the volume knob
+        canvas.fill_circle(
+            thumb_x,
+            thumb_y,
+            thumb_radius,
+            RadialGradient(
+                thumb_x + thumb_radius,
+                thumb_y + thumb_radius,
+                thumb_x,
+                thumb_y + thumb_radius,
+                thumb_radius * 2,
+                handler.secondary_colour,
+                handler.primary_colour
+            )
+        )
+
+        if handler.thumb_glow:
+            canvas.fill_circle(
+                thumb_x,
+                thumb_y,
+                thumb_radius * 2,
+                RadialGradient(
+                    thumb_x,
+                    thumb_y,
+                    thumb_x,
+                    thumb_y,
+                    thumb_radius * 4,
+                    _TRANSPARENT,
+                    _TRANSPARENT,
+                    (
+                        (_TRANSPARENT, 0.355),
+                        (handler.neon_colour + (255,), 0.28),
+                        (_TRANSPARENT, 0.258)
+                    )
+                )
+            )
+
+        if handler.ticks:
+            bands = numpy.asarray(handler.tick_bands, dtype=numpy.int32)
+            coords = numpy.asarray(handler.tick_coords, dtype=numpy.float32).reshape(-1, 4)
+            pen_width = handler.tick_pen_width
+
+            # one path per colour band, the same as the wx renderer
+            for band in numpy.unique(bands):
+                canvas.stroke_lines(
+                    coords[bands == band],
+                    pen_width,
+                    handler.get_band_colour(int(band))
+                )
+
+        pixels = canvas.pixels
+        alpha = pixels[..., 3:]
+        rgb = numpy.where(alpha > 0.0, pixels[..., :3] / numpy.maximum(alpha, 1e-9), 0.0)
+
+        frame = self._frame[top:bottom, left:right]
+        frame[..., :3] = numpy.rint(numpy.clip(rgb, 0.0, 1.0) * 255.0)
+        frame[..., 3] = numpy.rint(numpy.clip(alpha[..., 0], 0.0, 1.0) * 255.0)
+
+        return self._frame
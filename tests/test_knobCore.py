@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+import math
+
+import pytest
+
+import knobCore
+
+
+SIZE = (200, 200)
+
+
+def create_handler(min_value, max_value, increment, tick_frequency, page_size=None):
+    handler = knobCore.Handler()
+    handler.min_value = min_value
+    handler.max_value = max_value
+    handler.increment = increment
+    handler.value = min_value
+    handler.tick_frequency = tick_frequency
+    handler.page_size = page_size
+    handler.size = SIZE
+    return handler
+
+
+def old_values(handler):
+    # the values the knob used to walk, frange(min, max + increment, increment)
+    start = float(handler.min_value)
+    stop = handler.max_value + handler.increment
+    count = int(math.ceil(stop - start) / handler.increment)
+    values = [start + n * handler.increment for n in range(count)]
+    return [value for value in values if value <= handler.max_value]
+
+
+def old_ticks(handler):
+    """
+    (value, large) of every tick the way the knob used to pick them.
+    """
+    span = handler.max_value - handler.min_value
+    num_large_ticks = int(round(span / handler.page_size)) + 1
+    large_tick_frequency = (num_large_ticks - 1) * handler.increment
+
+    return [
+        (value, not value % large_tick_frequency)
+        for value in old_values(handler)
+        if not value % handler.tick_frequency
+    ]
+
+
+def is_large(handler, index):
+    x1, y1, _, _ = handler.get_tick_line(index)
+    center_x, center_y = SIZE[0] / 2.0, SIZE[1] / 2.0
+    distance = math.hypot(x1 - center_x, y1 - center_y)
+
+    center = min(SIZE) / 2.0
+    large_radius = center - round(center * 0.05)
+    small_radius = handler.radius * 1.20
+    return distance > (large_radius + small_radius) / 2.0
+
+
+GRID_CASES = [
+    # min, max, increment, tick frequency, page size
+    (0.0, 100.0, 1.0, 1.0, None),
+    (0.0, 100.0, 1.0, 2.5, None),
+    (0.0, 100.0, 2.0, 5.0, None),
+    (0.0, 100.0, 2.0, 5.0, 5.0),
+    (0.0, 100.0, 0.5, 2.5, 10.0),
+    (10.0, 100.0, 1.0, 5.0, 5.0),
+    (-50.0, 50.0, 1.0, 5.0, 25.0),
+    (3.0, 93.0, 2.0, 4.0, 10.0),
+    (0.0, 1000.0, 1.0, 1.0, 100.0),
+]
+
+
+@pytest.mark.parametrize('min_value, max_value, increment, tick_frequency, page_size', GRID_CASES)
+def test_ticks_match_old_grid(min_value, max_value, increment, tick_frequency, page_size):
+    handler = create_handler(min_value, max_value, increment, tick_frequency, page_size)
+    expected = old_ticks(handler)
+
+    assert list(handler.tick_values) == [value for value, _ in expected]
+    assert [is_large(handler, i) for i in range(len(expected))] == [large for _, large in expected]
+
+
+@pytest.mark.parametrize('min_value, max_value, increment, tick_frequency, page_size', GRID_CASES)
+def test_pages_match_old_grid(min_value, max_value, increment, tick_frequency, page_size):
+    handler = create_handler(min_value, max_value, increment, tick_frequency, page_size)
+
+    for step, value in enumerate(old_values(handler)):
+        assert handler.is_page_step(step) == (not value % handler.page_size), value
+
+
+@pytest.mark.parametrize('min_value, max_value, increment, tick_frequency, page_size', [
+    # the old keys only stayed on the increment grid for these
+    case for case in GRID_CASES if case[4] is not None and not case[4] % case[2] and not case[0] % case[2]
+])
+def test_page_keys_match_old_grid(min_value, max_value, increment, tick_frequency, page_size):
+    handler = create_handler(min_value, max_value, increment, tick_frequency, page_size)
+
+    for value in old_values(handler):
+        handler.value = value
+
+        up = value + page_size
+        up -= up % page_size
+        assert handler.step_to_value(handler.get_page_up_step()) == up
+
+        down = value - (value % page_size)
+        if down == value:
+            down -= page_size
+        assert handler.step_to_value(handler.get_page_down_step()) == down
+
+
+def test_grid_of_sizes_that_are_not_multiples_of_the_increment():
+    assert knobCore._get_grid(0.0, 1.0, 2.5) == (0, 5)
+    assert knobCore._get_grid(0.0, 2.0, 5.0) == (0, 5)
+    assert knobCore._get_grid(1.0, 2.0, 5.0) == (2, 5)
+    assert knobCore._get_grid(0.5, 1.0, 5.0) is None
+    assert knobCore._get_grid(0.0, 0.1, 0.5) == (0, 5)
+
+
+
+def test_top_step_stays_within_the_maximum():
+    handler = create_handler(0.0, 11.0, 4.0, 4.0)
+
+    assert handler.num_steps == 2
+    assert handler.step_to_value(handler.num_steps) == 8.0
+
+    handler.value = 11.0
+    assert handler.value == 8.0
+
+    handler.value = 100.0
+    assert handler.value == 8.0
+
+    handler.value = -5.0
+    assert handler.value == 0.0
+
+
+@pytest.mark.parametrize('min_value, increment, value', [
+    (0.0, 0.1, 0.3),
+    (0.0, 0.1, 0.7),
+    (0.05, 0.1, 0.35),
+    (-1.0, 0.01, 0.29),
+    (0.0, 0.25, 0.75),
+])
+def test_values_are_the_decimals_that_were_set(min_value, increment, value):
+    handler = create_handler(min_value, min_value + 200 * increment, increment, increment)
+    handler.value = value
+
+    assert handler.value == value
+
+
+def test_tick_values_are_the_decimals_of_the_scale():
+    handler = create_handler(0.0, 1.0, 0.1, 0.1)
+
+    assert list(handler.tick_values) == [n / 10.0 for n in range(11)]
+
+
+COLOUR_CASES = [
+    # min, max, increment, tick frequency, tick ranges, number of colours
+    (0.0, 100.0, 1.0, 1.0, [75.0, 90.0, 100.0], 3),
+    (0.0, 100.0, 1.0, 2.5, [75.0, 90.0, 100.0], 2),
+    (0.0, 100.0, 0.5, 1.0, [10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0, 80.0, 90.0, 100.0], 10),
+    (-60.0, 12.0, 1.0, 3.0, [-20.0, -6.0, 0.0, 6.0, 12.0], 5),
+    (0.0, 50.0, 1.0, 1.0, [12.5, 37.5], 1),
+]
+
+COLOURS = [(n * 20, 255 - n * 20, n * 10, 255) for n in range(12)]
+
+
+def create_coloured_handler(min_value, max_value, increment, tick_frequency, tick_ranges, num_colours):
+    handler = create_handler(min_value, max_value, increment, tick_frequency)
+    handler.foreground_colour = (0, 0, 0, 255)
+    handler.tick_range_colors = COLOURS[:num_colours]
+    handler.tick_ranges = tick_ranges
+    return handler
+
+
+def linear_bands(handler):
+    # the band of every tick the way it was found before the range index
+    range_steps = [
+        int(math.floor((tick_range - handler.min_value) / handler.increment + 1e-9))
+        for tick_range in handler.tick_ranges
+    ]
+    bands = []
+
+    for tick_step in handler.tick_steps:
+        band = -1
+
+        if tick_step <= handler.step:
+            for index, range_step in enumerate(range_steps):
+                if tick_step <= range_step:
+                    if index < len(handler.tick_range_colors):
+                        band = index
+                    break
+
+        bands += [band]
+
+    return bands
+
+
+@pytest.mark.parametrize('min_value, max_value, increment, tick_frequency, page_size', GRID_CASES)
+def test_numpy_and_python_tick_coords_match(monkeypatch, min_value, max_value, increment, tick_frequency,
+                                            page_size):
+    if knobCore.numpy is None:
+        pytest.skip('numpy is not installed')
+
+    with_numpy = create_handler(min_value, max_value, increment, tick_frequency, page_size)
+    coords = with_numpy.tick_coords
+
+    monkeypatch.setattr(knobCore, 'numpy', None)
+    without_numpy = create_handler(min_value, max_value, increment, tick_frequency, page_size)
+
+    assert list(without_numpy.tick_coords) == list(coords)
+    assert list(without_numpy.tick_values) == list(with_numpy.tick_values)
+
+
+@pytest.mark.parametrize('case', COLOUR_CASES)
+def test_range_index_matches_linear_scan(case):
+    handler = create_coloured_handler(*case)
+    min_value, max_value = case[0], case[1]
+
+    for value in knobCore.frange(min_value, max_value + 1.0, 1.0):
+        if value > max_value:
+            break
+
+        handler.value = value
+        assert list(handler.tick_bands) == linear_bands(handler), value
+
+
+@pytest.mark.parametrize('case', COLOUR_CASES)
+def test_recolouring_matches_full_rebuild(case):
+    handler = create_coloured_handler(*case)
+    num_steps = handler.num_steps
+    _ = handler.tick_bands
+
+    # big and small moves in both directions, ending on both ends
+    steps = [num_steps // 2, num_steps // 2 + 1, 3, num_steps, num_steps - 1, 0, 1, num_steps // 3, num_steps, 0]
+
+    for step in steps:
+        handler.step = step
+
+        fresh = create_coloured_handler(*case)
+        fresh.step = step
+
+        assert list(handler.tick_bands) == list(fresh.tick_bands), step
+        assert handler.neon_colour == fresh.neon_colour, step
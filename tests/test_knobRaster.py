@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+import knobCore  # NOQA: E402
+import knobRaster  # NOQA: E402
+
+
+BACKGROUND_COLOUR = (80, 80, 80, 255)
+FOREGROUND_COLOUR = (10, 20, 30, 255)
+TICK_COLOURS = [(0, 255, 0, 255), (255, 187, 0, 255), (255, 0, 0, 255)]
+
+
+def create_handler(size=(300, 200), **style):
+    handler = knobCore.Handler()
+    handler.min_value = 0.0
+    handler.max_value = 100.0
+    handler.increment = 1.0
+    handler.value = 50.0
+    handler.tick_frequency = 5.0
+    handler.foreground_colour = FOREGROUND_COLOUR
+    handler.tick_range_colors = TICK_COLOURS
+    handler.tick_ranges = [75.0, 90.0, 100.0]
+    handler.size = size
+
+    for name in ('glow', 'depression', 'thumb_glow', 'ticks', 'shadow'):
+        setattr(handler, name, style.get(name, False))
+
+    return handler
+
+
+def test_frame_shape_and_dtype():
+    handler = create_handler(glow=True, depression=True, thumb_glow=True, ticks=True, shadow=True)
+    frame = knobRaster.RasterRenderer(handler).render(BACKGROUND_COLOUR)
+
+    assert frame.shape == (200, 300, 4)
+    assert frame.dtype == numpy.uint8
+
+
+def test_background_is_filled():
+    handler = create_handler()
+    frame = knobRaster.RasterRenderer(handler).render(BACKGROUND_COLOUR)
+
+    # the corners are outside of the knob
+    for y, x in ((0, 0), (0, 299), (199, 0), (199, 299)):
+        assert tuple(frame[y, x]) == BACKGROUND_COLOUR
+
+
+def test_pixels_outside_of_the_clip_are_untouched():
+    handler = create_handler(ticks=True, thumb_glow=True)
+    renderer = knobRaster.RasterRenderer(handler)
+    before = renderer.render(BACKGROUND_COLOUR).copy()
+
+    handler.value = 90.0
+    clip = (40, 30, 120, 80)
+    after = renderer.render(BACKGROUND_COLOUR, clip)
+
+    x, y, width, height = clip
+    outside = numpy.ones(after.shape[:2], dtype=bool)
+    outside[y:y + height, x:x + width] = False
+
+    assert (after[outside] == before[outside]).all()
+    assert (after[~outside] != before[~outside]).any()
+
+
+def test_clipped_render_matches_full_render():
+    handler = create_handler((600, 600), ticks=True, thumb_glow=True, glow=True)
+    renderer = knobRaster.RasterRenderer(handler)
+    renderer.render(BACKGROUND_COLOUR)
+
+    handler.value = 80.0
+    clipped = renderer.render(BACKGROUND_COLOUR, (0, 0, 600, 300)).copy()
+    full = knobRaster.RasterRenderer(handler).render(BACKGROUND_COLOUR)
+
+    assert (clipped[:300] == full[:300]).all()
+
+
+@pytest.mark.parametrize('value', [0.0, 50.0, 80.0, 95.0, 100.0])
+def test_ticks_take_the_colour_of_their_band(value):
+    handler = create_handler((600, 600), ticks=True)
+    handler.value = value
+    frame = knobRaster.RasterRenderer(handler).render(BACKGROUND_COLOUR)
+
+    assert handler.tick_pen_width > 2.0
+
+    for index, band in enumerate(handler.tick_bands):
+        x1, y1, x2, y2 = handler.get_tick_line(index)
+        x = int((x1 + x2) / 2.0)
+        y = int((y1 + y2) / 2.0)
+
+        assert tuple(frame[y, x]) == tuple(handler.get_band_colour(band)), (index, band)
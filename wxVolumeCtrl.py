@@ -1,450 +1,1223 @@
 # -*- coding: utf-8 -*-
 import wx
+import itertools
 import math
-import threading
 
+from knobCore import (
+    SWEEP_START,
+    SWEEP_STOP,
+    Handler,
+    LRUCache,
+    frange,
+    _clock,
+    _colour_key,
+    _remap
+)
+
+try:
+    import knobRaster
+except ImportError:
+    knobRaster = None
+
+__all__ = [
+    # moved to knobCore, still importable from here
+    'Handler',
+    'frange',
+    '_remap',
+
+    'ResourcePool',
+    'resource_pool',
+    'FrameCache',
+    'frame_cache',
+    'KnobRenderer',
+    'RasterKnobRenderer',
+    'FrameThrottle',
+    'RepaintScheduler',
+    'MotionCoalescer',
+    'SetterQueue',
+    'ValueObserver',
+    'ease_linear',
+    'ease_in_quad',
+    'ease_out_quad',
+    'ease_in_out_quad',
+    'ease_out_cubic',
+    'ease_in_out_cubic',
+    'Animation',
+    'KnobEvent',
+    'wxEVT_KNOB_CHANGE',
+    'EVT_KNOB_CHANGE',
+    'KNOB_CHANGE_LINEUP',
+    'KNOB_CHANGE_LINEDOWN',
+    'KNOB_CHANGE_PAGEUP',
+    'KNOB_CHANGE_PAGEDOWN',
+    'KNOB_CHANGE_TOP',
+    'KNOB_CHANGE_BOTTOM',
+    'KNOB_CHANGE_CHANGED',
+    'KNOB_CHANGE_THUMBTRACK',
+    'KnobChangeEvent',
+    'KNOB_GLOW',
+    'KNOB_DEPRESSION',
+    'KNOB_HANDLE_GLOW',
+    'KNOB_TICKS',
+    'KNOB_SHADOW',
+    'KNOB_BACKEND_GRAPHICS_CONTEXT',
+    'KNOB_BACKEND_NUMPY',
+    'DefaultKnobStyle',
+    'KnobNameStr',
+    'KnobMixin',
+    'KnobCtrl'
+]
+
+
+class ResourcePool(LRUCache):
+    """
+    Pens, brushes and gradient brushes shared by every knob.
+
+    Resources are keyed by their colours, stops and geometry, so knobs that
+    look the same draw with the same native objects. The least recently used
+    entries are dropped once the estimated size of the pool goes over
+    `max_bytes`.
+    """
+
+    # rough native size of the cached objects
+    _PEN_SIZE = 128
+    _BRUSH_SIZE = 128
+    _STOP_SIZE = 48
+    _GRAPHICS_PEN_SIZE = 256
+    _GRAPHICS_BRUSH_SIZE = 512
+
+    def __init__(self, max_bytes=1024 * 1024):
+        LRUCache.__init__(self, max_bytes)
+
+    def _get(self, key, create, size):
+        resource = self.get(key)
+
+        if resource is None:
+            resource = create()
+            self.put(key, resource, size)
+
+        return resource
+
+    def get_pen(self, colour, width=1):
+        colour = _colour_key(colour)
+
+        return self._get(
+            ('pen', colour, width),
+            lambda: wx.Pen(wx.Colour(*colour), width),
+            self._PEN_SIZE
+        )
+
+    def get_graphics_pen(self, colour, width=1.0):
+        """
+        Pen for a wx.GraphicsContext, unlike a wx.Pen it keeps a fractional
+        width. The pen is created by the default renderer.
+        """
+        colour = _colour_key(colour)
+
+        def create():
+            renderer = wx.GraphicsRenderer.GetDefaultRenderer()
+            return renderer.CreatePen(wx.GraphicsPenInfo(wx.Colour(*colour)).Width(width))
+
+        return self._get(('graphics_pen', colour, width), create, self._GRAPHICS_PEN_SIZE)
+
+    def get_brush(self, colour):
+        colour = _colour_key(colour)
+
+        return self._get(
+            ('brush', colour),
+            lambda: wx.Brush(wx.Colour(*colour)),
+            self._BRUSH_SIZE
+        )
+
+    def get_gradient_stops(self, start_colour, end_colour, stops=()):
+        """
+        :param start_colour: colour at 0.0
+        :param end_colour: colour at 1.0
+        :param stops: sequence of (colour, position) pairs between the two
+        :return: wx.GraphicsGradientStops
+        """
+        start_colour = _colour_key(start_colour)
+        end_colour = _colour_key(end_colour)
+        stops = tuple((_colour_key(colour), pos) for colour, pos in stops)
+
+        def create():
+            gradient_stops = wx.GraphicsGradientStops()
+
+            for colour, pos in stops:
+                gradient_stops.Add(wx.GraphicsGradientStop(wx.Colour(*colour), pos))
+
+            gradient_stops.SetStartColour(wx.Colour(*start_colour))
+            gradient_stops.SetEndColour(wx.Colour(*end_colour))
+
+            return gradient_stops
+
+        return self._get(
+            ('stops', start_colour, end_colour, stops),
+            create,
+            self._STOP_SIZE * (len(stops) + 2)
+        )
+
+    def get_radial_brush(self, xo, yo, xc, yc, radius, start_colour, end_colour, stops=()):
+        """
+        Radial gradient brush, see wx.GraphicsRenderer.CreateRadialGradientBrush.
+
+        The brush is created by the default renderer which is also the one
+        used by wx.GraphicsContext.Create.
+        """
+        gradient_stops = self.get_gradient_stops(start_colour, end_colour, stops)
+
+        key = (
+            'radial',
+            xo,
+            yo,
+            xc,
+            yc,
+            radius,
+            _colour_key(start_colour),
+            _colour_key(end_colour),
+            tuple((_colour_key(colour), pos) for colour, pos in stops)
+        )
 
-def frange(start, stop=None, step=1.0):
+        def create():
+            renderer = wx.GraphicsRenderer.GetDefaultRenderer()
+            return renderer.CreateRadialGradientBrush(
+                xo,
+                yo,
+                xc,
+                yc,
+                radius,
+                gradient_stops
+            )
+
+        return self._get(key, create, self._GRAPHICS_BRUSH_SIZE)
+
+
+resource_pool = ResourcePool()
+
+
+class FrameCache(LRUCache):
+    """
+    Rendered knob frames shared by every knob that uses the cache.
+
+    Frames are keyed by the full render configuration of a knob and the
+    position of its value, so knobs configured the same way reuse the
+    bitmap another knob already rendered for a value. `max_bytes` is the
+    budget for the bitmap pixel data.
     """
-    Range function that accepts floats
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        LRUCache.__init__(self, max_bytes)
+
+
+frame_cache = FrameCache()
+
+
+_TRANSPARENT = (0, 0, 0, 0)
+
+
+def _draw_circle(x, y, r, gcdc):
+    gcdc.DrawEllipse(
+        int(round(float(x) - r)),
+        int(round(float(y) - r)),
+        int(round(r * 2.0)),
+        int(round(r * 2.0))
+    )
+
+
+class KnobRenderer(object):
     """
+    Draws the knob described by a `Handler` into a bitmap.
+
+    The parts of the knob that do not move with the value are kept as
+    cached RGBA bitmaps (layers). Each layer is stored along with a key built
+    from the handler state it depends on and it is only redrawn when that key
+    changes. The layers, from the bottom up, are
+
+        shadow: background fill and drop shadow
+        glow:   neon ring around the knob
+        body:   outside ring of the knob and the depression
+
+    The thumb, the thumb glow and the tick marks are drawn over the layers on
+    every render.
+
+    Without a frame cache every render goes into one back buffer that is
+    kept until the size of the knob changes, a clipped render only redraws
+    the clipped part of it.
+    """
+
+    backend = 'graphics_context'
+
+    def __init__(self, handler):
+        self._handler = handler
+        self._layers = {}
+        self._buffer = None
+        self._buffer_size = None
+        self.frame_cache = None
+
+    def resize(self):
+        """
+        Reallocates the back buffer for the current size of the handler.
+        """
+        width, height = self._handler.size
+
+        if width <= 0 or height <= 0:
+            self._buffer = None
+        else:
+            self._buffer = wx.EmptyBitmapRGBA(width, height)
+
+        self._buffer_size = (width, height)
+
+    def invalidate(self, name=None):
+        """
+        Drops a cached layer, or all of them if `name` is None.
+        """
+        if name is None:
+            self._layers.clear()
+        else:
+            self._layers.pop(name, None)
+
+    def _get_layer(self, name, key, draw):
+        instrumentation = self._handler.instrumentation
+
+        try:
+            layer_key, bmp = self._layers[name]
+        except KeyError:
+            pass
+        else:
+            if layer_key == key:
+                if instrumentation is not None:
+                    instrumentation.count('layer.hit')
+                return bmp
+
+        if instrumentation is not None:
+            instrumentation.count('layer.miss')
+            start = _clock()
+
+        width, height = self._handler.size
+        bmp = wx.EmptyBitmapRGBA(width, height)
+
+        dc = wx.MemoryDC()
+        dc.SelectObject(bmp)
+        gc = wx.GraphicsContext.Create(dc)
+        gcdc = wx.GCDC(gc)
+        gcdc.SetPen(wx.TRANSPARENT_PEN)
+        gcdc.SetBrush(wx.TRANSPARENT_BRUSH)
+
+        draw(gc, gcdc)
+
+        gcdc.Destroy()
+        del gcdc
+
+        dc.SelectObject(wx.NullBitmap)
+        dc.Destroy()
+        del dc
+
+        self._layers[name] = (key, bmp)
+
+        if instrumentation is not None:
+            instrumentation.record('layer.' + name, _clock() - start)
+
+        return bmp
+
+    def _draw_shadow_layer(self, background_colour):
+        handler = self._handler
+
+        def draw(gc, gcdc):
+            width, height = handler.size
+
+            gcdc.SetBrush(resource_pool.get_brush(background_colour))
+            gcdc.DrawRectangle(0, 0, width, height)
+            gcdc.SetBrush(wx.TRANSPARENT_BRUSH)
+
+            if not handler.shadow:
+                return
+
+            x_center, y_center = handler.center
+            radius = handler.radius
+
+            gc.SetBrush(
+                resource_pool.get_radial_brush(
+                    x_center + (radius * 0.10),
+                    y_center + (radius * 0.10),
+                    x_center + (radius * 0.30),
+                    y_center + (radius * 0.30),
+                    radius * 2.3,
+                    (0, 0, 0, 255),
+                    _TRANSPARENT,
+                    ((_TRANSPARENT, 0.45), ((0, 0, 0, 255), 0.25))
+                )
+            )
+
+            _draw_circle(x_center + (radius * 0.10), y_center + (radius * 0.10), radius * 2, gcdc)
+
+            # eliminate any shadow under the knob just in case there is a color
+            # used in the gradient of the knob that does not have an alpha level of 255
+
+            gc.SetBrush(resource_pool.get_brush(background_colour))
+            _draw_circle(x_center, y_center, radius - 2, gcdc)
+
+        key = (tuple(handler.size), handler.shadow, _colour_key(background_colour))
+        return self._get_layer('shadow', key, draw)
+
+    def _draw_glow_layer(self):
+        handler = self._handler
+        neon_colour = handler.neon_colour
+
+        def draw(gc, _gcdc):
+            x_center, y_center = handler.center
+            radius = handler.radius
+
+            gc.SetBrush(
+                resource_pool.get_radial_brush(
+                    x_center,
+                    y_center,
+                    x_center,
+                    y_center,
+                    radius * 4,
+                    _TRANSPARENT,
+                    _TRANSPARENT,
+                    (
+                        (_TRANSPARENT, 0.265),
+                        (neon_colour + (255,), 0.25),
+                        (_TRANSPARENT, 0.248)
+                    )
+                )
+            )
+
+            _draw_circle(x_center, y_center, radius * 2, _gcdc)
+
+        key = (tuple(handler.size), tuple(neon_colour))
+        return self._get_layer('glow', key, draw)
+
+    def _draw_body_layer(self):
+        handler = self._handler
+
+        def draw(gc, gcdc):
+            x_center, y_center = handler.center
+            radius = handler.radius
+
+            # outside ring of volume knob
+            gc.SetBrush(
+                resource_pool.get_radial_brush(
+                    x_center - radius,
+                    y_center - radius,
+                    x_center,
+                    y_center - radius,
+                    radius * 2,
+                    handler.secondary_colour,
+                    handler.primary_colour
+                )
+            )
+
+            _draw_circle(x_center, y_center, radius, gcdc)
+
+            # inside of volume knob
+            if handler.depression:
+                center_radius = handler.center_radius
+                gc.SetBrush(
+                    resource_pool.get_radial_brush(
+                        x_center + center_radius,
+                        y_center + center_radius,
+                        x_center,
+                        y_center + center_radius,
+                        center_radius * 2,
+                        handler.secondary_colour,
+                        handler.primary_colour
+                    )
+                )
+
+                _draw_circle(x_center, y_center, center_radius, gcdc)
+
+        key = (
+            tuple(handler.size),
+            handler.depression,
+            handler.thumb_multiplier,
+            handler.primary_colour,
+            handler.secondary_colour
+        )
+        return self._get_layer('body', key, draw)
+
+    def render(self, background_colour, clip=None):
+        """
+        Renders the knob.
+
+        :param background_colour: colour the knob is drawn over.
+        :param clip: optional (x, y, width, height) box, only the area inside
+            of it is drawn.
+        :return: wx.Bitmap the size of the handler
 
-    start = float(start)
-    step = float(step)
+        When a frame cache is set the whole frame is rendered, or taken
+        from the cache, and the clip is ignored. Otherwise the back buffer
+        is returned, it is drawn over by the next render.
+        """
+        handler = self._handler
+        frame_cache = self.frame_cache
+        instrumentation = handler.instrumentation
+
+        if instrumentation is not None:
+            start = _clock()
+
+        if frame_cache is not None:
+            # cached frames are whole frames, the caller clips the blit
+            key = (self.backend, handler.render_key, _colour_key(background_colour), handler.step)
+            bmp = frame_cache.get(key)
+
+            if bmp is not None:
+                if instrumentation is not None:
+                    instrumentation.count('frame_cache.hit')
+                    instrumentation.record('render', _clock() - start)
+                return bmp
+
+            if instrumentation is not None:
+                instrumentation.count('frame_cache.miss')
+
+            bmp = self._render(background_colour, None, None)
+            width, height = handler.size
+            frame_cache.put(key, bmp, width * height * 4)
+        else:
+            if self._buffer is None or self._buffer_size != tuple(handler.size):
+                # a new buffer has nothing in it to keep outside of the clip
+                self.resize()
+                clip = None
+
+            bmp = self._render(background_colour, clip, self._buffer)
+
+        if instrumentation is not None:
+            instrumentation.record('render', _clock() - start)
+
+        return bmp
+
+    def _render(self, background_colour, clip, bmp):
+        """
+        Internal use, draws the knob into `bmp` or into a new bitmap when
+        `bmp` is None.
+        """
+        handler = self._handler
+        width, height = handler.size
 
-    if stop is None:
-        stop, start = start, 0.0
+        if bmp is None:
+            bmp = wx.EmptyBitmapRGBA(width, height)
 
-    count = int(math.ceil(stop - start) / step)
-    return iter(start + (n * step) for n in range(count))
+        # the shadow layer fills the background, drawing it first covers
+        # whatever the last render left in the buffer
+        layers = [self._draw_shadow_layer(background_colour)]
 
+        if handler.glow:
+            layers += [self._draw_glow_layer()]
 
-def _remap(value, old_min, old_max, new_min, new_max):
-    old_range = old_max - old_min
-    new_range = new_max - new_min
+        layers += [self._draw_body_layer()]
 
-    try:
-        return (
-            (((value - old_min) * new_range) / old_range) + new_min
+        dc = wx.MemoryDC()
+        dc.SelectObject(bmp)
+        gc = wx.GraphicsContext.Create(dc)
+        gcdc = wx.GCDC(gc)
+
+        if clip is not None:
+            gc.Clip(*clip)
+
+        for layer in layers:
+            gc.DrawBitmap(layer, 0, 0, width, height)
+
+        gcdc.SetPen(wx.TRANSPARENT_PEN)
+
+        thumb_x, thumb_y = handler.thumb_position
+        thumb_radius = handler.thumb_radius
+
+        # the thumb is drawn around the origin so its gradients are pooled
+        # once for every position, moving by whole pixels keeps the circle
+        # where rounding the absolute position puts it
+        origin_x = int(round(thumb_x))
+        origin_y = int(round(thumb_y))
+        thumb_x -= origin_x
+        thumb_y -= origin_y
+
+        gc.PushState()
+        gc.Translate(origin_x, origin_y)
+
+        # handle of the volume knob
+        gc.SetBrush(
+            resource_pool.get_radial_brush(
+                thumb_radius,
+                thumb_radius,
+                0,
+                thumb_radius,
+                thumb_radius * 2,
+                handler.secondary_colour,
+                handler.primary_colour
+            )
         )
-    except ZeroDivisionError:
-        return new_min
 
+        _draw_circle(thumb_x, thumb_y, thumb_radius, gcdc)
 
-class Handler(object):
+        if handler.thumb_glow:
+            neon_colour = handler.neon_colour
 
-    def __init__(self):
-        self._size = None
-        self._tick_list = None
-        self._value = None
-        self._min_value = None
-        self._max_value = None
-        self._thumb_multiplier = 0.04
-        self._thumb_position = None
-        self._thumb_radius = None
-        self._radius = None
-        self._thumb_orbit = None
-        self._neon_radius = None
-        self._neon_colour = None
-        self._foreground_colour = None
-        self._background_colour = None
-        self._tick_pens = []
-        self._tick_ranges = []
-        self._tick_range_colours = []
-        self._default_tick_pen = None
-        self._tick_frequency = 2.0
-        self._increment = 1.0
-        self._secondary_colour = wx.WHITE
-        self._primary_colour = wx.Colour(33, 33, 33)
-        self._page_size = None
-        self._glow = False
-        self._depression = False
-        self._thumb_glow = False
-        self._ticks = False
-        self._shadow = False
+            gc.SetBrush(
+                resource_pool.get_radial_brush(
+                    0,
+                    0,
+                    0,
+                    0,
+                    thumb_radius * 4,
+                    _TRANSPARENT,
+                    _TRANSPARENT,
+                    (
+                        (_TRANSPARENT, 0.355),
+                        (neon_colour + (255,), 0.28),
+                        (_TRANSPARENT, 0.258)
+                    )
+                )
+            )
+
+            _draw_circle(thumb_x, thumb_y, thumb_radius * 2, gcdc)
+
+        gc.PopState()
+
+        gcdc.SetBrush(wx.TRANSPARENT_BRUSH)
+
+        # draw the tick marks
+        if handler.ticks:
+            instrumentation = handler.instrumentation
+
+            if instrumentation is not None:
+                start = _clock()
+
+            # one path per colour band, each stroked once
+            paths = {}
+            coords = iter(handler.tick_coords)
+
+            for band, x1, y1, x2, y2 in zip(handler.tick_bands, coords, coords, coords, coords):
+                try:
+                    path = paths[band]
+                except KeyError:
+                    path = paths[band] = gc.CreatePath()
+
+                path.MoveToPoint(x1, y1)
+                path.AddLineToPoint(x2, y2)
+
+            # the pen width is worked out along with the tick geometry
+            pen_width = handler.tick_pen_width
+
+            for band, path in paths.items():
+                gc.SetPen(resource_pool.get_graphics_pen(handler.get_band_colour(band), pen_width))
+                gc.StrokePath(path)
+
+            if instrumentation is not None:
+                instrumentation.record('ticks', _clock() - start)
+
+        gcdc.Destroy()
+        del gcdc
+
+        dc.SelectObject(wx.NullBitmap)
+        dc.Destroy()
+        del dc
+
+        return bmp
+
+
+class RasterKnobRenderer(KnobRenderer):
+    """
+    KnobRenderer that draws the knob with the numpy rasterizer in knobRaster
+    instead of a wx.GraphicsContext, the RGBA pixels are copied into the
+    bitmap in one go.
+    """
+
+    backend = 'numpy'
+
+    def __init__(self, handler):
+        if knobRaster is None:
+            raise RuntimeError('The numpy render backend needs numpy')
+
+        KnobRenderer.__init__(self, handler)
+        self._raster = knobRaster.RasterRenderer(handler)
+
+    def invalidate(self, name=None):
+        KnobRenderer.invalidate(self, name)
+        self._raster.invalidate()
+
+    def _render(self, background_colour, clip, bmp):
+        instrumentation = self._handler.instrumentation
+
+        if instrumentation is not None:
+            start = _clock()
+
+        rgba = self._raster.render(background_colour, clip)
+
+        if instrumentation is not None:
+            instrumentation.record('raster', _clock() - start)
+
+        if bmp is None:
+            height, width = rgba.shape[:2]
+            return wx.Bitmap.FromBufferRGBA(width, height, rgba)
+
+        bmp.CopyFromBuffer(rgba, wx.BitmapBufferFormat_RGBA)
+        return bmp
+
+
+class FrameThrottle(object):
+    """
+    Calls `callback` on the GUI thread at most once per frame.
+
+    `schedule` asks for the next frame, requests made before it runs are
+    collapsed into it. Frames are spaced at least 1 / max_fps seconds apart
+    where max_fps is read from `rate` for every frame, so any number of
+    throttles can follow one frame rate. The callback is not called once
+    the window has been destroyed.
+
+    :param window: wx.Window the frames are for.
+    :param callback: called without arguments for every frame.
+    :param rate: object with a `max_fps` attribute.
+    """
+
+    def __init__(self, window, callback, rate):
+        self._window = window
+        self._callback = callback
+        self._rate = rate
+        self._pending = False
+        self._last_frame = 0.0
+        self._timer = None
 
     @property
-    def shadow(self):
-        return self._shadow
+    def pending(self):
+        return self._pending
+
+    def schedule(self):
+        """
+        Asks for a frame, does nothing when one is already scheduled.
+
+        :return: None
+        """
+        if self._pending:
+            return
+
+        self._pending = True
+        delay = self._last_frame + (1.0 / self._rate.max_fps) - _clock()
+
+        if delay > 0:
+            self._timer = wx.CallLater(int(math.ceil(delay * 1000)), self._on_frame)
+        else:
+            wx.CallAfter(self._on_frame)
+
+    def flush(self):
+        """
+        Runs the scheduled frame right away.
+
+        :return: None
+        """
+        if self._timer is not None:
+            self._timer.Stop()
+
+        self._on_frame()
+
+    def cancel(self):
+        """
+        Drops the scheduled frame.
+
+        :return: None
+        """
+        if self._timer is not None:
+            self._timer.Stop()
+            self._timer = None
+
+        self._pending = False
+
+    def _on_frame(self):
+        self._timer = None
+
+        if not self._pending:
+            return
+
+        self._pending = False
+
+        # the window may have been destroyed while the frame was queued
+        if not self._window:
+            return
+
+        self._last_frame = _clock()
+        self._callback()
 
-    @shadow.setter
-    def shadow(self, value):
-        self._shadow = value
+
+def _is_on_screen(window):
+    # a hidden window or one in a minimised frame gets no paint events
+    if not window.IsShownOnScreen():
+        return False
+
+    top = wx.GetTopLevelParent(window)
+    return not (top and top.IsIconized())
+
+
+class RepaintScheduler(object):
+    """
+    Collapses any number of refresh requests for a window into at most one
+    paint per frame.
+
+    Damaged areas passed to `invalidate` are merged until the next frame,
+    frames are spaced at least 1 / max_fps seconds apart.
+
+    When `instrumentation` is set every request is counted by its source
+    and every frame that is flushed is counted as `frame`. `on_unpainted`
+    is called in place of the paint when a frame fires while the window is
+    not on screen.
+    """
+
+    def __init__(self, window, max_fps=60):
+        self.instrumentation = None
+        self.on_unpainted = None
+        self._window = window
+        self._max_fps = max_fps
+        self._rect = None
+        self._full = False
+        self._frames = FrameThrottle(window, self._on_frame, self)
 
     @property
-    def glow(self):
-        return self._glow
+    def max_fps(self):
+        return self._max_fps
 
-    @glow.setter
-    def glow(self, value):
-        self._glow = value
+    @max_fps.setter
+    def max_fps(self, value):
+        if value <= 0:
+            raise ValueError('max_fps must be greater than 0')
+        self._max_fps = value
 
     @property
-    def depression(self):
-        return self._depression
+    def pending(self):
+        return self._frames.pending
+
+    def invalidate(self, rect=None, source=None):
+        """
+        Marks an area of the window as needing a repaint.
+
+        :param rect: wx.Rect of the damaged area, None for the whole window.
+        :param source: what caused the repaint, only used for instrumentation.
+        :return: None
+        """
+        if self.instrumentation is not None:
+            self.instrumentation.count('invalidate.' + (source or 'other'))
+
+        if rect is None:
+            self._full = True
+            self._rect = None
+        elif not self._full:
+            if self._rect is None:
+                self._rect = wx.Rect(*rect.Get())
+            else:
+                self._rect = self._rect.Union(rect)
+
+        self._frames.schedule()
+
+    def flush(self):
+        """
+        Paints any pending damage right away.
+
+        :return: None
+        """
+        self._frames.flush()
+
+    def _on_frame(self):
+        rect = self._rect
+        full = self._full
+
+        self._full = False
+        self._rect = None
 
-    @depression.setter
-    def depression(self, value):
-        self._depression = value
+        window = self._window
 
-    @property
-    def thumb_glow(self):
-        return self._thumb_glow
+        if not _is_on_screen(window):
+            if self.on_unpainted is not None:
+                self.on_unpainted()
+            return
 
-    @thumb_glow.setter
-    def thumb_glow(self, value):
-        self._thumb_glow = value
+        if self.instrumentation is not None:
+            self.instrumentation.count('frame')
 
-    @property
-    def primary_colour(self):
-        return self._primary_colour
+        if full:
+            window.Refresh()
+        else:
+            window.RefreshRect(rect, eraseBackground=False)
 
-    @primary_colour.setter
-    def primary_colour(self, value):
-        self._primary_colour = value
+        window.Update()
 
-    @property
-    def secondary_colour(self):
-        return self._secondary_colour
 
-    @secondary_colour.setter
-    def secondary_colour(self, value):
-        self._secondary_colour = value
+class MotionCoalescer(object):
+    """
+    Keeps only the latest pointer position of a drag and hands it to a
+    callback at most once per frame.
 
-    @property
-    def foreground_colour(self):
-        return self._foreground_colour
+    Frames are spaced the same way the RepaintScheduler spaces paints, at
+    the frame rate of `rate`.
+    """
 
-    @foreground_colour.setter
-    def foreground_colour(self, value):
-        self._tick_list = None
-        self._default_tick_pen = wx.Pen(value, 2)
-        self._foreground_colour = value
+    def __init__(self, window, callback, rate):
+        self._callback = callback
+        self._position = None
+        self._frames = FrameThrottle(window, self._on_frame, rate)
 
     @property
-    def background_colour(self):
-        return self._background_colour
+    def pending(self):
+        return self._frames.pending
 
-    @background_colour.setter
-    def background_colour(self, value):
-        self._background_colour = value
+    def push(self, position):
+        """
+        Queues a pointer position, replacing any position still waiting for
+        the next frame.
 
-    @property
-    def min_value(self):
-        return self._min_value
+        :param position: (x, y) tuple.
+        :return: None
+        """
+        self._position = position
+        self._frames.schedule()
 
-    @min_value.setter
-    def min_value(self, value):
-        self._min_value = value
+    def flush(self):
+        """
+        Hands the queued position to the callback right away.
 
-    @property
-    def max_value(self):
-        return self._max_value
+        :return: None
+        """
+        self._frames.flush()
 
-    @max_value.setter
-    def max_value(self, value):
-        self._max_value = value
+    def cancel(self):
+        """
+        Drops the queued position.
 
-    @property
-    def size(self):
-        return self._size
-
-    @size.setter
-    def size(self, value):
-        self._radius = None
-        self._thumb_radius = None
-        self._neon_radius = None
-        self._thumb_orbit = None
-        self._thumb_position = None
-        self._tick_list = None
-        self._size = value
+        :return: None
+        """
+        self._frames.cancel()
+        self._position = None
 
-    @property
-    def center(self):
-        width, height = self.size
+    def _on_frame(self):
+        position = self._position
+        self._position = None
+        self._callback(position)
 
-        return int(width / 2), int(height / 2)
 
-    @property
-    def radius(self):
-        if self._radius is None:
-            width, height = self.size
-            radius = (min(width, height) // 2) * 0.75
-            self._radius = radius
+class SetterQueue(object):
+    """
+    Latest-value-wins slots for setter calls made from any thread.
+
+    `post` stores the call in a slot keyed by the name of the setter and,
+    when no frame is scheduled yet, asks the GUI thread for one with a
+    single wx.CallAfter. Posting takes no lock, it relies on dict item
+    assignment being atomic. Once per frame the GUI thread takes the newest
+    call of every setter out of the slots and applies them in the order
+    they were posted, older calls to the same setter are dropped. Frames
+    follow the frame rate of `rate`.
+    """
 
-        return self._radius
+    def __init__(self, window, target, rate):
+        self._target = target
+        self._slots = {}
+        self._order = itertools.count()
+        self._scheduled = False
+        self._frames = FrameThrottle(window, self._on_frame, rate)
 
-    @property
-    def value(self):
-        return self._value
+    def post(self, name, args):
+        """
+        Queues a call to a setter of the target, safe to call from any
+        thread.
 
-    @value.setter
-    def value(self, value):
-        self._thumb_position = None
-        self._tick_list = None
-        self._value = value
+        :param name: name of the setter method.
+        :param args: tuple of arguments for the setter.
+        :return: None
+        """
+        self._slots[name] = (next(self._order), args)
 
-    @property
-    def neon_radius(self):
-        if self._neon_radius is None:
-            radius = self.radius
-            self._neon_radius = radius - 1
+        if not self._scheduled:
+            self._scheduled = True
+            wx.CallAfter(self._frames.schedule)
 
-        return self._neon_radius
+    def _on_frame(self):
+        # cleared before the slots are read, a call posted while the frame
+        # runs is either applied now or schedules the next frame
+        self._scheduled = False
 
-    @property
-    def thumb_multiplier(self):
-        return self._thumb_multiplier
+        calls = []
 
-    @thumb_multiplier.setter
-    def thumb_multiplier(self, value):
-        self._thumb_radius = None
-        self._thumb_orbit = None
-        self._thumb_position = None
-        self._thumb_multiplier = value
+        for name in list(self._slots):
+            call = self._slots.pop(name, None)
 
-    @property
-    def thumb_radius(self):
-        if self._thumb_radius is None:
-            radius = self.radius
-            self._thumb_radius = radius * self.thumb_multiplier
+            if call is not None:
+                calls += [(call[0], name, call[1])]
 
-        return self._thumb_radius
+        calls.sort(key=lambda item: item[0])
 
-    @property
-    def thumb_orbit(self):
-        if self._thumb_orbit is None:
-            radius = self.radius
-            center_radius = self.center_radius
-            self._thumb_orbit = int(round((radius - center_radius) / 2.0)) + center_radius
+        for _, name, args in calls:
+            getattr(self._target, name)(*args)
 
-        return self._thumb_orbit
 
-    @property
-    def neon_colour(self):
-        colour = self._neon_colour
-        colours = self.tick_range_colors
+class ValueObserver(object):
+    """
+    Delivers the value changes of a knob to one subscriber at the pace the
+    subscriber can handle.
+
+        debounce:  seconds, changes are collected until the value has not
+                   changed for this long. With `trailing` the last value is
+                   delivered then, with `leading` the first change of a
+                   burst is delivered right away.
+        max_rate:  most deliveries per second, with `trailing` the newest
+                   value held back is delivered once the rate allows it.
+        on_settle: called with the value once it has not changed for
+                   `settle` seconds and the thumb is not being dragged.
+
+    Without debounce and max_rate every change is delivered. Timers run on
+    the GUI thread.
+    """
 
-        for i, r_value in enumerate(self.tick_ranges):
-            if r_value < self.value:
-                try:
-                    colour = colours[i + 1]
-                except IndexError:
-                    break
+    def __init__(
+        self,
+        knob,
+        callback,
+        debounce=None,
+        leading=False,
+        trailing=True,
+        max_rate=None,
+        on_settle=None,
+        settle=0.25
+    ):
+        if debounce is not None and max_rate is not None:
+            raise ValueError('debounce and max_rate can not be used together')
+        if debounce is not None and debounce <= 0:
+            raise ValueError('debounce must be greater than 0')
+        if max_rate is not None and max_rate <= 0:
+            raise ValueError('max_rate must be greater than 0')
+
+        self._knob = knob
+        self._callback = callback
+        self._debounce = debounce
+        self._leading = leading
+        self._trailing = trailing
+        self._max_rate = max_rate
+        self._on_settle = on_settle
+        self._settle = settle
 
-        if isinstance(colour, wx.Colour):
-            colour = colour.Get(False)
+        self._value = None
+        self._delivered = None
+        self._last_delivery = 0.0
+        self._in_burst = False
+        self._timer = None
+        self._settle_timer = None
 
-        if len(colour) == 4:
-            colour = colour[:-1]
+    def notify(self, value):
+        """
+        Hands a changed value to the observer.
 
-        return colour
+        :return: None
+        """
+        self._value = value
 
-    @property
-    def center_radius(self):
-        thumb_radius = self.thumb_radius
+        if self._on_settle is not None:
+            self._settle_timer = self._start(self._settle_timer, self._settle, self._on_settle_timer)
 
-        return self.radius - (thumb_radius * 2) - (self.radius * 0.1)
+        if self._debounce is not None:
+            if self._leading and not self._in_burst:
+                self._deliver(value)
 
-    @property
-    def thumb_position(self):
-        if self._thumb_position is None:
-            width, height = self.size
+            self._in_burst = True
+            self._timer = self._start(self._timer, self._debounce, self._on_debounce_timer)
 
-            x_center = width // 2
-            y_center = height // 2
+        elif self._max_rate is not None:
+            wait = self._last_delivery + (1.0 / self._max_rate) - _clock()
 
-            thumb_orbit = self.thumb_orbit
-            thumb_degree = _remap(self.value, self.min_value, self.max_value, 135.0, 405.0)
-            thumb_radian = math.radians(thumb_degree)
+            if wait <= 0:
+                self._deliver(value)
+            elif self._trailing and (self._timer is None or not self._timer.IsRunning()):
+                self._timer = self._start(self._timer, wait, self._on_throttle_timer)
 
-            cos = math.cos(thumb_radian)
-            sin = math.sin(thumb_radian)
+        else:
+            self._deliver(value)
 
-            thumb_x = x_center + int(round(thumb_orbit * cos))
-            thumb_y = y_center + int(round(thumb_orbit * sin))
+    def cancel(self):
+        """
+        Stops the observer, values held back are not delivered.
 
-            self._thumb_position = (thumb_x, thumb_y)
+        :return: None
+        """
+        for timer in (self._timer, self._settle_timer):
+            if timer is not None:
+                timer.Stop()
 
-        return self._thumb_position
+        self._in_burst = False
 
-    @property
-    def tick_pens(self):
-        return self._tick_pens
+    @staticmethod
+    def _start(timer, seconds, func):
+        milliseconds = max(1, int(math.ceil(seconds * 1000)))
 
-    @property
-    def tick_range_colors(self):
-        return self._tick_range_colours
+        if timer is None:
+            return wx.CallLater(milliseconds, func)
 
-    @tick_range_colors.setter
-    def tick_range_colors(self, value):
-        del self._tick_pens[:]
+        timer.Restart(milliseconds)
+        return timer
 
-        for colour in value:
-            self._tick_pens += [wx.Pen(colour, 1)]
+    def _deliver(self, value):
+        self._delivered = value
+        self._last_delivery = _clock()
+        self._callback(value)
 
-        self._tick_list = None
-        self._tick_range_colours = value
+    def _on_debounce_timer(self):
+        self._in_burst = False
 
-    @property
-    def tick_ranges(self):
-        return self._tick_ranges
+        if self._trailing and self._value != self._delivered:
+            self._deliver(self._value)
 
-    @tick_ranges.setter
-    def tick_ranges(self, value):
-        self._tick_list = None
-        self._tick_ranges = value
+    def _on_throttle_timer(self):
+        if self._value != self._delivered:
+            self._deliver(self._value)
 
-    @property
-    def increment(self):
-        return self._increment
+    def _on_settle_timer(self):
+        knob = self._knob
 
-    @increment.setter
-    def increment(self, value):
-        self._increment = value
+        # the knob may have been destroyed while the timer ran
+        if not knob:
+            return
 
-    @property
-    def tick_frequency(self):
-        return self._tick_frequency
+        if knob.HasCapture():
+            self._settle_timer = self._start(self._settle_timer, self._settle, self._on_settle_timer)
+            return
 
-    @tick_frequency.setter
-    def tick_frequency(self, value):
-        self._tick_frequency = value
+        self._on_settle(self._value)
 
-    @property
-    def page_size(self):
-        if self._page_size is None:
-            return (self.max_value - self.min_value) / 10.0
-        return self._page_size
 
-    @page_size.setter
-    def page_size(self, value):
-        self._page_size = value
-        self._tick_list = None
+def ease_linear(t):
+    return t
 
-    @property
-    def ticks(self):
-        return self._ticks
 
-    @ticks.setter
-    def ticks(self, value):
-        self._ticks = value
+def ease_in_quad(t):
+    return t * t
 
-    @property
-    def tick_list(self):
-        if self._tick_list is None:
 
-            width, height = self.size
-            center = int(round(min(width, height) / 2.0))
+def ease_out_quad(t):
+    return t * (2.0 - t)
 
-            center_x = int(round(width / 2.0))
-            center_y = int(round(height / 2.0))
 
-            large_outside_radius = center - int(round(center * 0.05))
-            inside_radius = int(round(large_outside_radius * 0.90))
-            small_outside_radius = int(round(self.radius * 1.20))
+def ease_in_out_quad(t):
+    if t < 0.5:
+        return 2.0 * t * t
+    return -1.0 + (4.0 - 2.0 * t) * t
 
-            ticks = []
 
-            tick_pens = self.tick_pens
-            num_small_ticks = int(round((self.max_value - self.min_value) / self.tick_frequency)) + 1
-            num_large_ticks = int(round((self.max_value - self.min_value) / self.page_size)) + 1
-            num_small_ticks -= num_large_ticks
+def ease_out_cubic(t):
+    t -= 1.0
+    return t * t * t + 1.0
 
-            large_tick_frequency = (num_large_ticks - 1) * self.increment
 
-            pen_size = max(1.0, (center * 0.015) - (num_small_ticks / 100.0))
+def ease_in_out_cubic(t):
+    if t < 0.5:
+        return 4.0 * t * t * t
+    t = 2.0 * t - 2.0
+    return 0.5 * t * t * t + 1.0
 
-            print
 
-            for i in frange(self.min_value, self.max_value + self.increment, self.increment):
-                if i % self.tick_frequency:
-                    continue
+class Animation(object):
+    """
+    Moves a knob through a list of values over a fixed amount of time.
+
+    The animation runs on the GUI thread from a wx.Timer firing at the
+    control's frame rate. The value shown for a frame is computed from the
+    elapsed time, so a slow paint makes the animation skip values instead of
+    slowing it down, and a tick is skipped entirely while the previous frame
+    has not been painted yet. Each leg between two values gets a share of
+    the duration in proportion to its length and is eased on its own.
+    """
 
-                if i <= self.value:
-                    for pen_num, tick_range in enumerate(self.tick_ranges):
-                        if i <= tick_range:
-                            if pen_num < len(tick_pens):
-                                pen = tick_pens[pen_num]
-                            else:
-                                pen = self._default_tick_pen
+    def __init__(self, ctrl, values, duration, easing=ease_in_out_cubic, callback=None):
+        """
+        :param ctrl: KnobCtrl to animate.
+        :param values: values to move through, the first one is the start.
+        :param duration: length of the animation in seconds.
+        :param easing: function mapping 0.0 - 1.0 progress to 0.0 - 1.0.
+        :param callback: called with the animation once it has completed or
+            has been cancelled.
+        """
+        self._ctrl = ctrl
+        self._easing = easing
+        self._callback = callback
+        self._duration = float(duration)
+        self._start = None
+        self._running = False
+        self._cancelled = False
+
+        self._legs = []
+        distances = [abs(b - a) for a, b in zip(values[:-1], values[1:])]
+        total = float(sum(distances))
+        start_time = 0.0
+
+        for (a, b), distance in zip(zip(values[:-1], values[1:]), distances):
+            if total:
+                leg_time = self._duration * (distance / total)
+            else:
+                leg_time = self._duration / len(distances)
 
-                            self._neon_colour = pen.GetColour().Get(False)
-                            break
-                    else:
-                        pen = self._default_tick_pen
-                else:
-                    pen = self._default_tick_pen
+            self._legs += [(start_time, leg_time, a, b)]
+            start_time += leg_time
 
-                pen.SetWidth(pen_size)
-                degree = _remap(i, self.min_value, self.max_value, 135.0, 405.0)
-                radian = math.radians(degree)
-                cos = math.cos(radian)
-                sin = math.sin(radian)
+        self._end_value = values[-1]
 
-                x2 = center_x + int(round(inside_radius * cos))
-                y2 = center_y + int(round(inside_radius * sin))
+        self._timer = wx.Timer()
+        self._timer.Bind(wx.EVT_TIMER, self._on_timer)
 
-                if i % large_tick_frequency:
-                    x1 = center_x + int(round(small_outside_radius * cos))
-                    y1 = center_y + int(round(small_outside_radius * sin))
-                else:
-                    x1 = center_x + int(round(large_outside_radius * cos))
-                    y1 = center_y + int(round(large_outside_radius * sin))
+    @property
+    def running(self):
+        return self._running
 
-                ticks += [[i, pen, [x1, y1, x2, y2]]]
-            self._tick_list = ticks
+    @property
+    def cancelled(self):
+        return self._cancelled
 
-        return self._tick_list
+    def start(self):
+        self._start = _clock()
+        self._running = True
+        self._timer.Start(max(1, int(1000.0 / self._ctrl.GetMaxFrameRate())))
 
-    def _get_tick_number(self, value):
-        value_range = self.max_value + self.increment - self.min_value
-        num_ticks = value_range * self.tick_frequency
+    def cancel(self):
+        """
+        Stops the animation where it is and calls the callback.
+        """
+        if self._running:
+            self._cancelled = True
+            self._finish()
 
-        tick_num = _remap(value, self.min_value, self._max_value, 0, num_ticks)
-        return int(tick_num)
+    def get_value(self, elapsed):
+        """
+        The animated value `elapsed` seconds after the start.
+        """
+        if elapsed >= self._duration:
+            return self._end_value
 
-    def is_value_line_up(self, value):
-        if value < self.value:
-            return False
+        for start_time, leg_time, a, b in self._legs:
+            if elapsed < start_time + leg_time:
+                if leg_time <= 0:
+                    return b
+                t = self._easing((elapsed - start_time) / leg_time)
+                return a + (b - a) * t
 
-        ticks = self.tick_list
+        return self._end_value
 
-        for i, (v, pen, coords) in enumerate(ticks):
-            if v == value:
-                break
-        else:
-            return False
+    def _finish(self):
+        self._running = False
+        self._timer.Stop()
 
-        if i == len(ticks) - 1:
-            return False
-        if ticks[i + 1][2] != coords:
-            return True
+        if self._callback is not None:
+            self._callback(self)
 
-        return False
+    def _on_timer(self, _):
+        if not self._running:
+            return
 
-    def is_value_line_down(self, value):
-        if value > self.value:
-            return False
-        ticks = self.tick_list
+        ctrl = self._ctrl
 
-        for i, (v, pen, coords) in enumerate(ticks):
-            if v == value:
-                break
-        else:
-            return False
+        if not ctrl:
+            self._running = False
+            self._timer.Stop()
+            return
 
-        if i == 0:
-            return False
-        if ticks[i - 1][2] != coords:
-            return True
+        # the last frame has not been painted yet
+        if ctrl._repaint.pending:
+            return
 
-        return False
+        elapsed = _clock() - self._start
+        ctrl._set_animation_value(self.get_value(elapsed))
 
-    def is_page(self, value):
-        if value % self.page_size:
-            return False
-        return True
+        if elapsed >= self._duration:
+            self._finish()
 
 
 class KnobEvent(wx.PyCommandEvent):
@@ -478,68 +1251,135 @@ class KnobEvent(wx.PyCommandEvent):
     Orientation = property(fget=GetOrientation, fset=SetOrientation)
 
 
+wxEVT_KNOB_CHANGE = wx.NewEventType()
+EVT_KNOB_CHANGE = wx.PyEventBinder(wxEVT_KNOB_CHANGE, 1)
+
+# conditions a single change crossed, see KnobChangeEvent.GetFlags
+KNOB_CHANGE_LINEUP = 1 << 0
+KNOB_CHANGE_LINEDOWN = 1 << 1
+KNOB_CHANGE_PAGEUP = 1 << 2
+KNOB_CHANGE_PAGEDOWN = 1 << 3
+KNOB_CHANGE_TOP = 1 << 4
+KNOB_CHANGE_BOTTOM = 1 << 5
+KNOB_CHANGE_CHANGED = 1 << 6
+KNOB_CHANGE_THUMBTRACK = 1 << 7
+
+# the scroll events the flags stand for, in the order they are sent
+_CHANGE_EVENTS = (
+    (KNOB_CHANGE_LINEUP, wx.wxEVT_SCROLL_LINEUP),
+    (KNOB_CHANGE_LINEDOWN, wx.wxEVT_SCROLL_LINEDOWN),
+    (KNOB_CHANGE_PAGEUP, wx.wxEVT_SCROLL_PAGEUP),
+    (KNOB_CHANGE_PAGEDOWN, wx.wxEVT_SCROLL_PAGEDOWN),
+    (KNOB_CHANGE_TOP, wx.wxEVT_SCROLL_TOP),
+    (KNOB_CHANGE_BOTTOM, wx.wxEVT_SCROLL_BOTTOM),
+    (KNOB_CHANGE_CHANGED, wx.wxEVT_SCROLL_CHANGED),
+    (KNOB_CHANGE_THUMBTRACK, wx.wxEVT_SCROLL_THUMBTRACK)
+)
+
+_LINE_FLAGS = {
+    None: 0,
+    wx.wxEVT_SCROLL_LINEUP: KNOB_CHANGE_LINEUP,
+    wx.wxEVT_SCROLL_LINEDOWN: KNOB_CHANGE_LINEDOWN
+}
+
+
+class KnobChangeEvent(KnobEvent):
+    """
+    Single EVT_KNOB_CHANGE event sent for a value change in place of the
+    separate scroll events, see KnobCtrl.SetConsolidatedEvents.
+
+    The control reuses one instance for every change, copy what is needed
+    out of it instead of keeping a reference.
+    """
+
+    def __init__(self, id=1):
+        KnobEvent.__init__(self, wxEVT_KNOB_CHANGE, id)
+
+        self.__old_position = 0
+        self.__flags = 0
+
+    def SetOldPosition(self, value):
+        self.__old_position = value
+
+    def GetOldPosition(self):
+        return self.__old_position
+
+    def SetFlags(self, value):
+        self.__flags = value
+
+    def GetFlags(self):
+        """
+        :return: bitmask of the KNOB_CHANGE_* conditions the change crossed
+        """
+        return self.__flags
+
+    def HasFlag(self, flag):
+        return bool(self.__flags & flag)
+
+    OldPosition = property(fget=GetOldPosition, fset=SetOldPosition)
+    Flags = property(fget=GetFlags, fset=SetFlags)
+
+
 KNOB_GLOW = 2 ** 2
 KNOB_DEPRESSION = 3 ** 2
 KNOB_HANDLE_GLOW = 4 ** 2
 KNOB_TICKS = 5 ** 2
 KNOB_SHADOW = 6 ** 2
 
+KNOB_BACKEND_GRAPHICS_CONTEXT = KnobRenderer.backend
+KNOB_BACKEND_NUMPY = RasterKnobRenderer.backend
+
+_BACKENDS = {
+    KNOB_BACKEND_GRAPHICS_CONTEXT: KnobRenderer,
+    KNOB_BACKEND_NUMPY: RasterKnobRenderer
+}
+
 DefaultKnobStyle = KNOB_GLOW | KNOB_DEPRESSION | KNOB_HANDLE_GLOW | KNOB_TICKS | KNOB_SHADOW
 KnobNameStr = 'Knob Control'
 
 
 # noinspection PyPep8Naming
-class KnobCtrl(wx.Control):
-
-    # noinspection PyShadowingBuiltins
-    def __init__(
-        self,
-        parent,
-        id=wx.ID_ANY,
-        value=0.0,
-        minValue=0.0,
-        maxValue=100.0,
-        increment=1.0,
-        pos=wx.DefaultPosition,
-        size=wx.DefaultSize,
-        style=0,
-        name=KnobNameStr,
-        knobStyle=DefaultKnobStyle
-    ):
-
-        wx.Control.__init__(
-            self,
-            parent,
-            id=id,
-            pos=pos,
-            size=size,
-            style=style | wx.BORDER_NONE,
-            name=name
-        )
+class KnobMixin(object):
+    """
+    Value, range, style, input and event handling of a knob, shared by
+    KnobCtrl and the knobs of a KnobBank.
 
-        self.SetBackgroundColour(parent.GetBackgroundColour())
+    Input arrives as plain positions, key codes and wheel turns in the
+    coordinates of the knob. The class using the mixin provides GetId,
+    HasCapture, CaptureMouse and ReleaseMouse and sets `_repaint` to an
+    object with the interface of a RepaintScheduler.
+    """
 
-        self.increment = increment
-        self.Bind(wx.EVT_PAINT, self.OnPaint)
-        self.Bind(wx.EVT_SIZE, self._on_size)
-        self.Bind(wx.EVT_ERASE_BACKGROUND, self._on_erase_background)
-        self.Bind(wx.EVT_MOUSE_CAPTURE_LOST, self._on_mouse_lost_capture)
-        self.Bind(wx.EVT_LEFT_DOWN, self._on_mouse_left_down)
-        self.Bind(wx.EVT_LEFT_UP, self._on_mouse_left_up)
-        self.Bind(wx.EVT_MOUSEWHEEL, self._on_mouse_wheel)
-        self.Bind(wx.EVT_CHAR_HOOK, self._on_char_hook)
+    def _init_knob(self, window, event_object, value, minValue, maxValue, increment, knobStyle):
+        """
+        Internal use, sets up the state of the knob, `_repaint` needs to be
+        set before this is called.
 
+        :param window: wx.Window the knob is drawn in.
+        :param event_object: wx.Window the events of the knob are sent from.
+        """
         self._handler = Handler()
-        self._handler.value = value
+        self._renderer = KnobRenderer(self._handler)
+        self._motion = MotionCoalescer(window, self._on_drag, self._repaint)
+        self._setters = SetterQueue(window, self, self._repaint)
+        self._event_object = event_object
         self._handler.min_value = minValue
         self._handler.max_value = maxValue
         self._handler.increment = increment
-        self._handler.background_colour = parent.GetBackgroundColour()
-        self._handler.foreground_colour = parent.GetForegroundColour()
+        self._handler.value = value
         self._last_degrees = None
+        self._coalesce_motion = False
+        self._drag_event_rate = None
+        self._last_drag_event = 0.0
+        self._drag_changed = False
+        self._drag_value = None
+        self._consolidate_events = False
+        self._change_event = None
         self._startup = False
-
-        self._handler.size = self.GetBestSize()
+        self._startup_duration = 2.0
+        self._animation = None
+        self._paint_callbacks = []
+        self._observers = []
 
         self._handler.glow = bool(knobStyle & KNOB_GLOW)
         self._handler.depression = bool(knobStyle & KNOB_DEPRESSION)
@@ -576,11 +1416,187 @@ class KnobCtrl(wx.Control):
 
         self._knob_style = knobStyle
 
-        def _do():
-            self.Refresh()
-            self.Update()
+        self._repaint.invalidate(source='style')
+
+    def GetMaxFrameRate(self):
+        return self._repaint.max_fps
+
+    def SetMaxFrameRate(self, value):
+        """
+        Sets the most times per second the control repaints, any number of
+        changes made between two frames are painted together.
+        """
+        self._repaint.max_fps = value
+
+    def Subscribe(
+        self,
+        callback,
+        debounce=None,
+        leading=False,
+        trailing=True,
+        max_rate=None,
+        on_settle=None,
+        settle=0.25
+    ):
+        """
+        Calls `callback` with the value for the changes EVT_SCROLL_CHANGED
+        is sent for, shaped for this subscriber only. See ValueObserver for
+        the options.
+
+        :return: ValueObserver, pass it to Unsubscribe to stop
+        """
+        observer = ValueObserver(
+            self,
+            callback,
+            debounce,
+            leading,
+            trailing,
+            max_rate,
+            on_settle,
+            settle
+        )
+        self._observers += [observer]
+
+        return observer
+
+    def Unsubscribe(self, observer):
+        observer.cancel()
+
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def PostValue(self, value):
+        """
+        Thread safe SetValue, can be called from any thread at any rate.
+
+        Only the newest value posted before the next frame is shown, values
+        outside of the range are clamped to it.
+        """
+        self._setters.post('_set_posted_value', (value,))
+
+    def PostSetter(self, name, *args):
+        """
+        Calls the Set* method `name` with `args` on the GUI thread, can be
+        called from any thread.
+
+        Calls are applied once per frame, only the newest call of each
+        setter made before the frame is applied.
+        """
+        if not name.startswith('Set') or getattr(type(self), name, None) is None:
+            raise AttributeError('{0} is not a setter of {1}'.format(name, type(self).__name__))
+
+        self._setters.post(name, args)
+
+    def _set_posted_value(self, value):
+        handler = self._handler
+        value = max(handler.min_value, min(handler.max_value, value))
+
+        self.SetValue(value)
+
+    def GetCoalesceMotion(self):
+        return self._coalesce_motion
+
+    def SetCoalesceMotion(self, value):
+        """
+        When set, pointer motion while dragging the thumb is collected and
+        only the latest position is applied, once per frame.
+        """
+        self._coalesce_motion = bool(value)
+
+        if not value:
+            self._motion.flush()
+
+    def GetDragEventRate(self):
+        return self._drag_event_rate
+
+    def SetDragEventRate(self, value):
+        """
+        Sets the most EVT_SCROLL_THUMBTRACK and EVT_SCROLL_CHANGED events sent
+        per second while dragging the thumb, None sends one for every change.
+        A change that was held back is sent before EVT_SCROLL_THUMBRELEASE.
+        """
+        if value is not None and value <= 0:
+            raise ValueError('drag event rate must be greater than 0')
+
+        self._drag_event_rate = value
+
+    def GetConsolidatedEvents(self):
+        return self._consolidate_events
+
+    def SetConsolidatedEvents(self, value):
+        """
+        When set, a value change sends a single EVT_KNOB_CHANGE event that
+        carries the old value, the new value and the KNOB_CHANGE_* flags of
+        the conditions that were crossed, instead of up to six scroll
+        events. EVT_SCROLL_THUMBRELEASE is still sent as a scroll event.
+        """
+        self._consolidate_events = bool(value)
+
+    def FlushRefresh(self):
+        """
+        Paints any pending changes right away instead of waiting for the
+        next frame.
+        """
+        self._repaint.flush()
+
+    def GetFrameCache(self):
+        return self._renderer.frame_cache
+
+    def SetFrameCache(self, cache):
+        """
+        Sets the FrameCache rendered frames are shared through, pass the
+        module level `frame_cache` to share frames with every other knob
+        using it or None to render every frame.
+        """
+        self._renderer.frame_cache = cache
+
+        if self._handler.instrumentation is not None:
+            self._handler.instrumentation.caches['frame_cache'] = cache
+
+        self._repaint.invalidate(source='frame_cache')
+
+    def GetRenderBackend(self):
+        return self._renderer.backend
+
+    def SetRenderBackend(self, backend):
+        """
+        Selects what draws the knob, KNOB_BACKEND_GRAPHICS_CONTEXT or
+        KNOB_BACKEND_NUMPY. The numpy backend rasterizes the knob without
+        a wx.GraphicsContext, see knobRaster for rendering frames outside
+        of the GUI thread.
+        """
+        try:
+            renderer_class = _BACKENDS[backend]
+        except KeyError:
+            raise ValueError('Unknown render backend: {0!r}'.format(backend))
+
+        if renderer_class is type(self._renderer):
+            return
+
+        renderer = renderer_class(self._handler)
+        renderer.frame_cache = self._renderer.frame_cache
+        self._renderer = renderer
+
+        self._repaint.invalidate(source='backend')
+
+    def GetInstrumentation(self):
+        return self._handler.instrumentation
+
+    def SetInstrumentation(self, instrumentation):
+        """
+        Attaches an Instrumentation the knob records its paint, layer, tick
+        and geometry timings, paint counts, repaint sources and cache hit
+        rates into. Pass None to turn it off again.
+
+        The same Instrumentation can be shared by several knobs to get
+        totals for all of them.
+        """
+        self._handler.instrumentation = instrumentation
+        self._repaint.instrumentation = instrumentation
 
-        wx.CallAfter(_do)
+        if instrumentation is not None:
+            instrumentation.caches['resource_pool'] = resource_pool
+            instrumentation.caches['frame_cache'] = self._renderer.frame_cache
 
     def GetPageSize(self):
         return self._handler.page_size
@@ -592,11 +1608,7 @@ class KnobCtrl(wx.Control):
             )
         self._handler.page_size = value
 
-        def _do():
-            self.Refresh()
-            self.Update()
-
-        wx.CallAfter(_do)
+        self._repaint.invalidate(source='page_size')
 
     def GetValueRange(self):
         return self._handler.min_value, self._handler.max_value
@@ -605,11 +1617,7 @@ class KnobCtrl(wx.Control):
         self._handler.min_value = minValue
         self._handler.max_value = maxValue
 
-        def _do():
-            self.Refresh()
-            self.Update()
-
-        wx.CallAfter(_do)
+        self._repaint.invalidate(source='range')
 
     def _create_event(self, event, value):
         """
@@ -619,27 +1627,58 @@ class KnobCtrl(wx.Control):
         """
         event = KnobEvent(event, self.GetId())
         event.SetId(self.GetId())
-        event.SetEventObject(self)
+        event.SetEventObject(self._event_object)
         event.SetPosition(value)
         event.SetOrientation(wx.HORIZONTAL)
-        self.GetEventHandler().ProcessEvent(event)
+        self._event_object.GetEventHandler().ProcessEvent(event)
 
-    def _on_char_hook(self, evt):
+    def _send_change(self, flags, old_value, value):
+        """
+        Internal use, sends the events for a value change
+        :param flags: KNOB_CHANGE_* conditions the change crossed.
+        :return: None
+        """
+        if self._consolidate_events:
+            self._send_change_event(flags, old_value, value)
+        else:
+            for flag, event_type in _CHANGE_EVENTS:
+                if flags & flag:
+                    self._create_event(event_type, value)
 
-        key_code = evt.GetKeyCode()
+        if flags & KNOB_CHANGE_CHANGED:
+            for observer in list(self._observers):
+                observer.notify(value)
 
-        if key_code in (wx.WXK_PAGEUP, wx.WXK_NUMPAD_PAGEUP):
-            value = self._handler.value + self._handler.page_size
-            value -= value % self._handler.page_size
+    def _send_change_event(self, flags, old_value, value):
+        event = self._change_event
 
-            event = None
+        if event is None:
+            event = self._change_event = KnobChangeEvent(self.GetId())
+            event.SetEventObject(self._event_object)
+            event.SetOrientation(wx.HORIZONTAL)
+        else:
+            # undo what the handlers of the last change did to the event
+            event.Skip(False)
+            event.ResumePropagation(wx.EVENT_PROPAGATE_MAX)
 
-        elif key_code in (wx.WXK_PAGEDOWN, wx.WXK_NUMPAD_PAGEDOWN):
-            value = self._handler.value - (self._handler.value % self._handler.page_size)
+        event.SetId(self.GetId())
+        event.SetOldPosition(old_value)
+        event.SetPosition(value)
+        event.SetFlags(flags)
+        self._event_object.GetEventHandler().ProcessEvent(event)
 
-            if value == self._handler.value:
-                value -= self._handler.page_size
+    def _key(self, key_code):
+        """
+        Internal use, moves the knob for a key press
+        :param key_code: wx key code.
+        :return: True if the key is one the knob handles
+        """
+        if key_code in (wx.WXK_PAGEUP, wx.WXK_NUMPAD_PAGEUP):
+            step = self._handler.get_page_up_step()
+            event = None
 
+        elif key_code in (wx.WXK_PAGEDOWN, wx.WXK_NUMPAD_PAGEDOWN):
+            step = self._handler.get_page_down_step()
             event = None
 
         elif key_code in (
@@ -649,7 +1688,7 @@ class KnobCtrl(wx.Control):
             wx.WXK_NUMPAD_ADD
         ):
             event = wx.wxEVT_SCROLL_LINEUP
-            value = self._handler.value + self._handler.increment
+            step = self._handler.step + 1
 
         elif key_code in (
             wx.WXK_DOWN,
@@ -658,117 +1697,134 @@ class KnobCtrl(wx.Control):
             wx.WXK_NUMPAD_SUBTRACT
         ):
             event = wx.wxEVT_SCROLL_LINEDOWN
-            value = self._handler.value - self._handler.increment
+            step = self._handler.step - 1
 
         elif key_code in (wx.WXK_HOME, wx.WXK_NUMPAD_HOME):
-            value = self._handler.min_value
+            step = 0
             event = None
 
         elif key_code in (wx.WXK_END, wx.WXK_NUMPAD_END):
-            value = self._handler.max_value
+            step = self._handler.num_steps
             event = None
 
         # numbers that represent 10% incremnts of the value range
         elif key_code - 48 in list(range(0, 10)):
             percent = (key_code - 48) * 0.1
-            value_range = self._handler.max_value - self._handler.min_value
-            value = value_range * percent
-
-            value += value % self._handler.increment
+            step = int(round(self._handler.num_steps * percent))
             event = None
 
         else:
-            evt.Skip()
-            return
+            return False
 
         self._last_degrees = None
-        self.__generate_events(event, value)
+        self.__generate_events(event, step)
 
-        evt.Skip()
+        return True
 
-    def _on_erase_background(self, _):
-        pass
+    def __generate_events(self, event, step, degrees=None, changed=True, thumbtrack=False):
+        handler = self._handler
+        num_steps = handler.num_steps
 
-    def _on_mouse_lost_capture(self, evt):
-        self._last_degrees = None
-        self.ReleaseMouse()
-        self.Unbind(wx.EVT_MOTION, handler=self._on_mouse_move)
-        self._create_event(wx.wxEVT_SCROLL_THUMBRELEASE, self.GetValue())
-        self.Refresh()
-        self.Update()
-        evt.Skip()
+        if step >= num_steps:
+            step = num_steps
+
+        elif step <= 0:
+            step = 0
 
-    def __generate_events(self, event, value, degrees=None):
+        if step != handler.step:
+            self._last_degrees = degrees
+            handler_step = handler.step
+            old_value = handler.value
+            self._set_handler_step(step)
+
+            flags = _LINE_FLAGS[event]
 
-        if value >= self._handler.max_value:
-            value = self._handler.max_value
+            if handler.is_page_step(step):
+                if step > handler_step:
+                    flags |= KNOB_CHANGE_PAGEUP
+                else:
+                    flags |= KNOB_CHANGE_PAGEDOWN
 
-        elif value <= self._handler.min_value:
-            value = self._handler.min_value
+            if step == num_steps:
+                flags |= KNOB_CHANGE_TOP
+            elif step == 0:
+                flags |= KNOB_CHANGE_BOTTOM
 
-        if value != self._handler.value:
-            self._last_degrees = degrees
-            handler_value = self._handler.value
-            self._handler.value = value
+            if changed:
+                flags |= KNOB_CHANGE_CHANGED
 
-            def _do():
-                self.Refresh()
-                self.Update()
+            if thumbtrack:
+                flags |= KNOB_CHANGE_THUMBTRACK
+
+            self._send_change(flags, old_value, handler.value)
+
+            return True
+
+        return False
+
+    def _set_handler_step(self, step):
+        """
+        Internal use, sets the handler step and refreshes only the parts
+        of the control that the change touches: the old and the new thumb
+        and the ticks that change colour. The whole control is refreshed
+        when the glow around the knob changes colour.
+        """
+        handler = self._handler
+        old_value = handler.value
 
-            wx.CallAfter(_do)
+        # the glow only has a colour once tick colours are set
+        glow = handler.glow and bool(handler.tick_range_colors)
 
-            if event is not None:
-                self._create_event(event, value)
+        if glow:
+            neon_colour = handler.neon_colour
+        else:
+            neon_colour = None
 
-            if self._handler.is_page(value):
-                if value > handler_value:
-                    self._create_event(wx.wxEVT_SCROLL_PAGEUP, value)
-                else:
-                    self._create_event(wx.wxEVT_SCROLL_PAGEDOWN, value)
+        rect = wx.Rect(*handler.thumb_box)
 
-            if value == self._handler.max_value:
-                self._create_event(wx.wxEVT_SCROLL_TOP, value)
-            elif value == self._handler.min_value:
-                self._create_event(wx.wxEVT_SCROLL_BOTTOM, value)
+        handler.step = step
 
-            self._create_event(wx.wxEVT_SCROLL_CHANGED, value)
+        if glow and handler.neon_colour != neon_colour:
+            rect = None
+            source = 'glow'
+        else:
+            rect = rect.Union(wx.Rect(*handler.thumb_box))
+            source = 'value'
 
-            return True
+            if handler.ticks:
+                tick_box = handler.get_tick_box(old_value, handler.value)
+                if tick_box is not None:
+                    rect = rect.Union(wx.Rect(*tick_box))
 
-        return False
+        self._repaint.invalidate(rect, source)
 
-    def _on_mouse_wheel(self, evt):
-        wheel_delta = evt.GetWheelRotation()
-        value = self._handler.value
+    def _wheel(self, wheel_delta):
+        """
+        Internal use, moves the knob one step for a turn of the mouse wheel
+        :return: True if the knob handled the turn
+        """
+        step = self._handler.step
 
         if wheel_delta < 0:
-            value -= self._handler.increment
+            step -= 1
             event = wx.wxEVT_SCROLL_LINEDOWN
 
         elif wheel_delta > 0:
-            value += self._handler.increment
+            step += 1
             event = wx.wxEVT_SCROLL_LINEUP
 
         else:
-            evt.Skip()
-            return
-
-        self.__generate_events(event, value)
-
-        evt.Skip()
-
-    def _on_mouse_left_up(self, evt):
+            return False
 
-        if self.HasCapture():
-            self.Unbind(wx.EVT_MOTION, handler=self._on_mouse_move)
-            self.ReleaseMouse()
-            self._create_event(wx.wxEVT_SCROLL_THUMBRELEASE, self.GetValue())
-            self.Refresh()
-            self.Update()
+        self.__generate_events(event, step)
 
-        evt.Skip()
+        return True
 
-    def _on_mouse_left_down(self, evt):
+    def _press(self, x, y):
+        """
+        Internal use, starts dragging the thumb when (x, y) is on it
+        :return: True if a drag was started
+        """
         thumb_x, thumb_y = self._handler.thumb_position
         thumb_radius = self._handler.thumb_radius
 
@@ -777,88 +1833,220 @@ class KnobCtrl(wx.Control):
         end_x = thumb_x + thumb_radius
         end_y = thumb_y + thumb_radius
 
-        x, y = evt.GetPosition()
-
         if start_x <= x <= end_x and start_y <= y <= end_y:
+            self._last_degrees = self._get_degrees(x, y)
+            self._drag_changed = False
+            self._last_drag_event = 0.0
+            self._drag_value = self.GetValue()
             self.CaptureMouse()
-            self.Bind(wx.EVT_MOTION, self._on_mouse_move)
+            return True
 
-        evt.Skip()
+        return False
 
-    def _on_mouse_move(self, evt):
+    def _release(self):
+        # apply the motion still waiting for its frame
+        self._motion.flush()
 
         if self.HasCapture():
-            thumb_x, thumb_y = self._handler.thumb_position
-            thumb_radius = self._handler.thumb_radius
+            self._end_drag()
 
-            start_x = thumb_x - (thumb_radius * 8)
-            start_y = thumb_y - (thumb_radius * 8)
-            end_x = thumb_x + (thumb_radius * 8)
-            end_y = thumb_y + (thumb_radius * 8)
+    def _lost_capture(self):
+        self._last_degrees = None
+        self._end_drag()
 
-            x, y = evt.GetPosition()
+    def _end_drag(self):
+        self._motion.cancel()
 
-            if start_x >= x or end_x <= x or start_y >= y or end_y <= y:
-                self.Unbind(wx.EVT_MOTION, handler=self._on_mouse_move)
-                self.ReleaseMouse()
-                self._create_event(wx.wxEVT_SCROLL_THUMBRELEASE, self.GetValue())
-                self.Refresh()
-                self.Update()
+        if self._drag_changed:
+            self._drag_changed = False
+            self._send_change(
+                KNOB_CHANGE_CHANGED | KNOB_CHANGE_THUMBTRACK,
+                self._drag_value,
+                self.GetValue()
+            )
 
-                evt.Skip()
-                return
+        self.ReleaseMouse()
+        self._create_event(wx.wxEVT_SCROLL_THUMBRELEASE, self.GetValue())
+        self._repaint.invalidate(source='release')
 
-            width, height = self.GetSize()
-            center_x = width / 2.0
-            center_y = height / 2.0
+    def _get_degrees(self, x, y):
+        width, height = self._handler.size
+        center_x = width / 2.0
+        center_y = height / 2.0
 
-            radians = math.atan2(y - center_y, x - center_x)
+        radians = math.atan2(y - center_y, x - center_x)
 
-            degrees = math.degrees(radians)
-            if degrees < 90:
-                degrees += 360
+        degrees = math.degrees(radians)
+        if degrees < 90:
+            degrees += 360
 
-            value = _remap(degrees, 135.0, 405.0, self._handler.min_value, self._handler.max_value)
+        return degrees
 
-            if (value % self._handler.increment) * 2 >= self._handler.increment:
-                if self._last_degrees < degrees:
-                    value -= (value % self._handler.increment)
-                    event = wx.wxEVT_SCROLL_LINEUP
+    def _get_value_degrees(self):
+        handler = self._handler
+        return _remap(handler.value, handler.min_value, handler.max_value, SWEEP_START, SWEEP_STOP)
 
-                elif self._last_degrees > degrees:
-                    value -= (value % self._handler.increment)
-                    event = wx.wxEVT_SCROLL_LINEDOWN
-                else:
-                    self._last_degrees = degrees
-                    evt.Skip()
-                    return
+    def _move(self, x, y):
+
+        if self.HasCapture():
+            if self._coalesce_motion:
+                self._motion.push((x, y))
+            else:
+                self._on_drag((x, y))
+
+    def _on_drag(self, position):
+        # the capture may have ended while the position was queued
+        if not self.HasCapture():
+            return
+
+        handler = self._handler
+        x, y = position
+        degrees = self._get_degrees(x, y)
+
+        # measure from where the thumb is at the pointer's angle, a coalesced
+        # position can be well ahead of the thumb that was last painted
+        x_center, y_center = handler.center
+        radians = math.radians(degrees)
+        thumb_x = x_center + handler.thumb_orbit * math.cos(radians)
+        thumb_y = y_center + handler.thumb_orbit * math.sin(radians)
+        thumb_radius = handler.thumb_radius
+
+        start_x = thumb_x - (thumb_radius * 8)
+        start_y = thumb_y - (thumb_radius * 8)
+        end_x = thumb_x + (thumb_radius * 8)
+        end_y = thumb_y + (thumb_radius * 8)
+
+        if start_x >= x or end_x <= x or start_y >= y or end_y <= y:
+            self._end_drag()
+            return
+
+        steps = _remap(degrees, SWEEP_START, SWEEP_STOP, 0, handler.num_steps)
+        step = int(math.floor(steps))
+
+        # keys, the wheel and the setters forget the angle of the last drag,
+        # a knob in a bank is never painted by itself to set it again
+        if self._last_degrees is None:
+            self._last_degrees = self._get_value_degrees()
+
+        if (steps - step) * 2 >= 1:
+            if self._last_degrees < degrees:
+                event = wx.wxEVT_SCROLL_LINEUP
+
+            elif self._last_degrees > degrees:
+                event = wx.wxEVT_SCROLL_LINEDOWN
             else:
                 self._last_degrees = degrees
-                evt.Skip()
                 return
+        else:
+            self._last_degrees = degrees
+            return
 
-            if self.__generate_events(event, value, degrees):
-                self._create_event(wx.wxEVT_SCROLL_THUMBTRACK, value)
-
-        evt.Skip()
+        now = _clock()
+        rate = self._drag_event_rate
+        notify = rate is None or now - self._last_drag_event >= 1.0 / rate
 
-    def _on_size(self, evt):
-        width, height = evt.GetSize()
-        self._handler.size = (width, height)
+        if self.__generate_events(event, step, degrees, notify, notify):
+            if notify:
+                self._last_drag_event = now
+                self._drag_value = handler.value
 
-        def do():
-            self.Refresh()
-            self.Update()
+            self._drag_changed = not notify
 
-        wx.CallAfter(do)
-        evt.Skip()
+    def RunStartupAnimation(self, duration=2.0):
+        """
+        Sweeps the knob from its value up to the maximum, down to the
+        minimum and back once the control is first painted.
 
-    def RunStartupAnimation(self):
+        :param duration: length of the sweep in seconds.
+        """
         if self._startup is False:
             self._startup = True
+            self._startup_duration = duration
+
+    def AnimateTo(self, value, duration=0.25, easing=ease_in_out_cubic, callback=None):
+        """
+        Moves the knob to `value` over `duration` seconds. Any running
+        animation is cancelled first.
+
+        :param value: value to end on.
+        :param duration: length of the animation in seconds.
+        :param easing: easing function, see `ease_in_out_cubic`.
+        :param callback: called with the `Animation` once it is done.
+        :return: the running `Animation`
+        """
+        if self._handler.min_value > value:
+            raise ValueError('new value is lower then the set minimum')
+        if self._handler.max_value < value:
+            raise ValueError('new value is higher then the set maximum')
+
+        return self._animate([self._handler.value, value], duration, easing, callback)
+
+    def StopAnimation(self):
+        if self._animation is not None:
+            self._animation.cancel()
+            self._animation = None
+
+    def IsAnimating(self):
+        return self._animation is not None and self._animation.running
+
+    def _animate(self, values, duration, easing=ease_in_out_cubic, callback=None):
+        self.StopAnimation()
+
+        def on_done(animation):
+            if self._animation is animation:
+                self._animation = None
+
+            if callback is not None:
+                callback(animation)
+
+        self._animation = Animation(self, values, duration, easing, on_done)
+        self._animation.start()
+        return self._animation
+
+    def _set_animation_value(self, value):
+        # snap the animated value to the increment
+        handler = self._handler
+        step = max(0, min(handler.num_steps, handler.value_to_step(value)))
+
+        if step != handler.step:
+            self._last_degrees = None
+            self._set_handler_step(step)
+
+    def _on_painted(self):
+        """
+        Internal use, called after the knob has been painted. Starts the
+        startup animation on the first paint.
+        """
+        if self._startup is True:
+            self._startup = None
+            value = self._handler.value
+            self._animate(
+                [value, self._handler.max_value, self._handler.min_value, value],
+                self._startup_duration
+            )
+        else:
+            self._startup = None
+
+        self._run_paint_callbacks()
+
+    def _call_after_paint(self, callback):
+        """
+        Internal use, calls `callback` once the changes made so far have
+        been painted, right away when no paint is pending.
+        """
+        if self._repaint.pending:
+            self._paint_callbacks += [callback]
+        else:
+            callback()
+
+    def _run_paint_callbacks(self):
+        callbacks, self._paint_callbacks = self._paint_callbacks, []
+
+        for callback in callbacks:
+            callback()
 
     def GetPrimaryColour(self):
-        return self._handler.primary_colour
+        return wx.Colour(*self._handler.primary_colour)
 
     def SetPrimaryColour(self, value):
 
@@ -867,14 +2055,10 @@ class KnobCtrl(wx.Control):
 
         self._handler.primary_colour = value
 
-        def do():
-            self.Refresh()
-            self.Update()
-
-        wx.CallAfter(do)
+        self._repaint.invalidate(source='colour')
 
     def GetSecondaryColour(self):
-        return self._handler.secondary_colour
+        return wx.Colour(*self._handler.secondary_colour)
 
     def SetSecondaryColour(self, value):
 
@@ -883,11 +2067,7 @@ class KnobCtrl(wx.Control):
 
         self._handler.secondary_colour = value
 
-        def do():
-            self.Refresh()
-            self.Update()
-
-        wx.CallAfter(do)
+        self._repaint.invalidate(source='colour')
 
     def GetTickFrequency(self):
         return self._handler.tick_frequency
@@ -899,11 +2079,7 @@ class KnobCtrl(wx.Control):
 
         self._handler.tick_frequency = value
 
-        def do():
-            self.Refresh()
-            self.Update()
-
-        wx.CallAfter(do)
+        self._repaint.invalidate(source='ticks')
 
     def GetThumbSize(self):
         return int(self._handler.thumb_multiplier * 100)
@@ -913,14 +2089,10 @@ class KnobCtrl(wx.Control):
 
         self._handler.thumb_multiplier = value
 
-        def do():
-            self.Refresh()
-            self.Update()
-
-        wx.CallAfter(do)
+        self._repaint.invalidate(source='thumb')
 
     def GetTickColours(self):
-        return self._handler.tick_range_colors
+        return [wx.Colour(*colour) for colour in self._handler.tick_range_colors]
 
     def SetTickColours(self, values):
 
@@ -934,11 +2106,7 @@ class KnobCtrl(wx.Control):
 
         self._handler.tick_range_colors = colours
 
-        def do():
-            self.Refresh()
-            self.Update()
-
-        wx.CallAfter(do)
+        self._repaint.invalidate(source='colour')
 
     def GetTickColorRanges(self):
         return self._handler.tick_ranges
@@ -946,16 +2114,7 @@ class KnobCtrl(wx.Control):
     def SetTickColourRanges(self, values):
         self._handler.tick_ranges = values
 
-        def do():
-            self.Refresh()
-            self.Update()
-
-        wx.CallAfter(do)
-
-    def SetSize(self, size):
-        wx.Control.SetSize(self, size)
-        width, height = self.GetSize()
-        self._handler.size = (width, height)
+        self._repaint.invalidate(source='ticks')
 
     def GetValue(self):
         return self._handler.value
@@ -968,13 +2127,7 @@ class KnobCtrl(wx.Control):
         if self._handler.max_value < value:
             raise ValueError('new value is higher then the set maximum')
 
-        self._handler.value = value
-
-        def do():
-            self.Refresh()
-            self.Update()
-
-        wx.CallAfter(do)
+        self._set_handler_step(self._handler.value_to_step(value))
 
     def GetIncrement(self):
         return self._handler.increment
@@ -982,11 +2135,7 @@ class KnobCtrl(wx.Control):
     def SetIncrement(self, increment):
         self._handler.increment = increment
 
-        def do():
-            self.Refresh()
-            self.Update()
-
-        wx.CallAfter(do)
+        self._repaint.invalidate(source='increment')
 
     def GetMinValue(self):
         return self._handler.min_value
@@ -994,11 +2143,7 @@ class KnobCtrl(wx.Control):
     def SetMinValue(self, value):
         self._handler.min_value = value
 
-        def do():
-            self.Refresh()
-            self.Update()
-
-        wx.CallAfter(do)
+        self._repaint.invalidate(source='range')
 
     def GetMaxValue(self):
         return self._handler.max_value
@@ -1006,263 +2151,147 @@ class KnobCtrl(wx.Control):
     def SetMaxValue(self, value):
         self._handler.max_value = value
 
-        def do():
-            self.Refresh()
-            self.Update()
-
-        wx.CallAfter(do)
-
-    def _run_startup(self):
-        value = self._handler.value
-        event = threading.Event()
-
-        for i in frange(
-                value,
-                self._handler.max_value + self._handler.increment,
-                self._handler.increment
-        ):
-            self.SetValue(i)
-            event.wait(0.02)
-
-        for i in frange(
-                self._handler.max_value,
-                self._handler.min_value - self._handler.increment,
-                -self._handler.increment
-        ):
-            self.SetValue(i)
-            event.wait(0.02)
-
-        for i in frange(
-                self._handler.min_value,
-                value + self._handler.increment,
-                self._handler.increment
-        ):
-            self.SetValue(i)
-            event.wait(0.02)
-
-    def OnPaint(self, _):
-
-        width, height = self._handler.size
+        self._repaint.invalidate(source='range')
 
-        if width <= 0 or height <= 0:
-            bmp = wx.EmptyBitmapRGBA(
-                1,
-                1
-            )
-            pdc = wx.PaintDC(self)
-            gcdc = wx.GCDC(pdc)
-            gcdc.DrawBitmap(bmp, 0, 0)
 
-            gcdc.Destroy()
-            del gcdc
+# noinspection PyPep8Naming
+class KnobCtrl(wx.Control, KnobMixin):
 
-            self._startup = None
-            return
+    # noinspection PyShadowingBuiltins
+    def __init__(
+        self,
+        parent,
+        id=wx.ID_ANY,
+        value=0.0,
+        minValue=0.0,
+        maxValue=100.0,
+        increment=1.0,
+        pos=wx.DefaultPosition,
+        size=wx.DefaultSize,
+        style=0,
+        name=KnobNameStr,
+        knobStyle=DefaultKnobStyle
+    ):
 
-        bmp = wx.EmptyBitmapRGBA(
-            width,
-            height
+        wx.Control.__init__(
+            self,
+            parent,
+            id=id,
+            pos=pos,
+            size=size,
+            style=style | wx.BORDER_NONE,
+            name=name
         )
 
-        dc = wx.MemoryDC()
-        dc.SelectObject(bmp)
-        gc = wx.GraphicsContext.Create(dc)
-        gcdc = wx.GCDC(gc)
-
-        gcdc.SetBrush(wx.Brush(self.GetBackgroundColour()))
-        gcdc.SetPen(wx.TRANSPARENT_PEN)
-
-        gcdc.DrawRectangle(0, 0, width, height)
-
-        def draw_circle(x, y, r, _gcdc):
-            _gcdc.DrawEllipse(
-                int(round(float(x) - r)),
-                int(round(float(y) - r)),
-                int(round(r * 2.0)),
-                int(round(r * 2.0))
-            )
-
-        gcdc.SetBrush(wx.TRANSPARENT_BRUSH)
-        x_center, y_center = self._handler.center
-
-        gcdc.SetPen(wx.TRANSPARENT_PEN)
-        radius = self._handler.radius
-
-        if self._handler.shadow:
-            # shadow
-            stops = wx.GraphicsGradientStops()
-            stops.Add(wx.GraphicsGradientStop(wx.TransparentColour, 0.45))
-            stops.Add(wx.GraphicsGradientStop(wx.Colour(0, 0, 0, 255), 0.25))
-
-            stops.SetStartColour(wx.Colour(0, 0, 0, 255))
-            stops.SetEndColour(wx.TransparentColour)
+        self.SetBackgroundColour(parent.GetBackgroundColour())
 
-            gc.SetBrush(
-                gc.CreateRadialGradientBrush(
-                    x_center + (radius * 0.10),
-                    y_center + (radius * 0.10),
-                    x_center + (radius * 0.30),
-                    y_center + (radius * 0.30),
-                    radius * 2.3,
-                    stops
-                )
-            )
+        # every pixel is painted from the back buffer, there is nothing to erase
+        self.SetBackgroundStyle(wx.BG_STYLE_PAINT)
 
-            draw_circle(x_center + (radius * 0.10), y_center + (radius * 0.10), radius * 2, gcdc)
+        self.increment = increment
+        self.Bind(wx.EVT_PAINT, self.OnPaint)
+        self.Bind(wx.EVT_SIZE, self._on_size)
+        self.Bind(wx.EVT_MOUSE_CAPTURE_LOST, self._on_mouse_lost_capture)
+        self.Bind(wx.EVT_LEFT_DOWN, self._on_mouse_left_down)
+        self.Bind(wx.EVT_LEFT_UP, self._on_mouse_left_up)
+        self.Bind(wx.EVT_MOTION, self._on_mouse_move)
+        self.Bind(wx.EVT_MOUSEWHEEL, self._on_mouse_wheel)
+        self.Bind(wx.EVT_CHAR_HOOK, self._on_char_hook)
 
-            # eliminate any shadow under the knob just in case there is a color
-            # used in the gradient of the knob that does not have an alpha level of 255
+        self._repaint = RepaintScheduler(self)
+        self._repaint.on_unpainted = self._run_paint_callbacks
+        self._init_knob(self, self, value, minValue, maxValue, increment, knobStyle)
+        self._handler.background_colour = parent.GetBackgroundColour()
+        self._handler.foreground_colour = parent.GetForegroundColour()
+        self._handler.size = self.GetBestSize()
+        self._renderer.resize()
 
-            gc.SetBrush(wx.Brush(self.GetBackgroundColour()))
-            draw_circle(x_center, y_center, radius - 2, gcdc)
+    def _on_char_hook(self, evt):
+        self._key(evt.GetKeyCode())
+        evt.Skip()
 
-        if self._handler.glow:
-            _ = self._handler.tick_list
-            neon_colour = self._handler.neon_colour
+    def _on_mouse_lost_capture(self, evt):
+        self._lost_capture()
+        evt.Skip()
 
-            stops = wx.GraphicsGradientStops()
+    def _on_mouse_wheel(self, evt):
+        self._wheel(evt.GetWheelRotation())
+        evt.Skip()
 
-            stops.Add(wx.GraphicsGradientStop(wx.TransparentColour, 0.265))
-            stops.Add(wx.GraphicsGradientStop(wx.Colour(*neon_colour + (255,)), 0.25))
-            stops.Add(wx.GraphicsGradientStop(wx.TransparentColour, 0.248))
+    def _on_mouse_left_up(self, evt):
+        self._release()
+        evt.Skip()
 
-            stops.SetStartColour(wx.TransparentColour)
-            stops.SetEndColour(wx.TransparentColour)
+    def _on_mouse_left_down(self, evt):
+        x, y = evt.GetPosition()
+        self._press(x, y)
+        evt.Skip()
 
-            gc.SetBrush(
-                gc.CreateRadialGradientBrush(
-                    x_center,
-                    y_center,
-                    x_center,
-                    y_center,
-                    radius * 4,
-                    stops
-                )
-            )
+    def _on_mouse_move(self, evt):
+        x, y = evt.GetPosition()
+        self._move(x, y)
+        evt.Skip()
 
-            draw_circle(x_center, y_center, radius * 2, gcdc)
+    def _on_size(self, evt):
+        width, height = evt.GetSize()
+        self._handler.size = (width, height)
+        self._renderer.resize()
 
-        # outside ring of volume knob
+        self._repaint.invalidate(source='size')
+        evt.Skip()
 
-        gc.SetBrush(
-            gc.CreateRadialGradientBrush(
-                x_center - radius,
-                y_center - radius,
-                x_center,
-                y_center - radius,
-                radius * 2,
-                self._handler.secondary_colour,
-                self._handler.primary_colour
+    def SetSize(self, size):
+        wx.Control.SetSize(self, size)
+        width, height = self.GetSize()
+        self._handler.size = (width, height)
+        self._renderer.resize()
 
-            )
-        )
+    def OnPaint(self, _):
+        instrumentation = self._handler.instrumentation
 
-        draw_circle(x_center, y_center, radius, gcdc)
+        if instrumentation is not None:
+            instrumentation.count('paint')
+            start = _clock()
 
-        thumb_x, thumb_y = self._handler.thumb_position
-        thumb_radius = self._handler.thumb_radius
+        width, height = self._handler.size
 
-        # inside of volume knob
-        if self._handler.depression:
-            center_radius = self._handler.center_radius
-            gc.SetBrush(
-                gc.CreateRadialGradientBrush(
-                    x_center + center_radius,
-                    y_center + center_radius,
-                    x_center,
-                    y_center + center_radius,
-                    center_radius * 2,
-                    self._handler.secondary_colour,
-                    self._handler.primary_colour
-                )
-            )
+        if width <= 0 or height <= 0:
+            # a paint event has to be answered with a paint dc even when
+            # there is nothing to draw
+            wx.PaintDC(self)
 
-            draw_circle(x_center, y_center, center_radius, gcdc)
+            self._startup = None
+            self._run_paint_callbacks()
+            return
 
         if self._last_degrees is None:
-            self._last_degrees = _remap(
-                self._handler.value,
-                self._handler.min_value,
-                self._handler.max_value,
-                135.0,
-                405.0
-            )
-
-        # handle of the volume knob
-        gc.SetBrush(
-            gc.CreateRadialGradientBrush(
-                thumb_x + thumb_radius,
-                thumb_y + thumb_radius,
-                thumb_x,
-                thumb_y + thumb_radius,
-                thumb_radius * 2,
-                self._handler.secondary_colour,
-                self._handler.primary_colour
-            )
-        )
-
-        draw_circle(thumb_x, thumb_y, thumb_radius, gcdc)
-
-        if self._handler.thumb_glow:
-            _ = self._handler.tick_list
-            neon_colour = self._handler.neon_colour
-
-            stops = wx.GraphicsGradientStops()
-
-            stops.Add(wx.GraphicsGradientStop(wx.TransparentColour, 0.355))
-            stops.Add(wx.GraphicsGradientStop(wx.Colour(*neon_colour + (255,)), 0.28))
-            stops.Add(wx.GraphicsGradientStop(wx.TransparentColour, 0.258))
-
-            stops.SetStartColour(wx.TransparentColour)
-            stops.SetEndColour(wx.TransparentColour)
-
-            gc.SetBrush(
-                gc.CreateRadialGradientBrush(
-                    thumb_x,
-                    thumb_y,
-                    thumb_x,
-                    thumb_y,
-                    thumb_radius * 4,
-                    stops
-                )
-            )
+            self._last_degrees = self._get_value_degrees()
 
-            draw_circle(thumb_x, thumb_y, thumb_radius * 2, gcdc)
-
-        gcdc.SetBrush(wx.TRANSPARENT_BRUSH)
+        # only redraw and blit the damaged part of the control
+        update_rect = self.GetUpdateRegion().GetBox()
 
-        # draw the tick marks
-        if self._handler.ticks:
-            ticks = []
-            pens = []
-            for _, pen, coords in self._handler.tick_list:
-                ticks += [coords]
-                pens += [pen]
+        if update_rect.width < width or update_rect.height < height:
+            clip = update_rect.Get()
+        else:
+            clip = None
 
-            gcdc.DrawLineList(ticks, pens)
+        bmp = self._renderer.render(self.GetBackgroundColour(), clip)
 
-        dc.SelectObject(wx.EmptyBitmap(1, 1))
-        gcdc.Destroy()
-        del gcdc
+        if instrumentation is not None:
+            blit_start = _clock()
 
-        dc.Destroy()
+        # the buffered paint dc copies the rendered frame straight to the
+        # client area when it goes away, the update region clips the copy
+        dc = wx.BufferedPaintDC(self, bmp)
         del dc
 
-        # create a buffered paint dc to draw the bmp to the client area
-        pdc = wx.PaintDC(self)
-        gcdc = wx.GCDC(pdc)
-        gcdc.DrawBitmap(bmp, 0, 0)
-
-        gcdc.Destroy()
-        del gcdc
+        if instrumentation is not None:
+            now = _clock()
+            instrumentation.record('blit', now - blit_start)
+            instrumentation.record('paint', now - start)
+            instrumentation.maybe_export()
 
-        if self._startup is True:
-            self._startup = None
-            t = threading.Thread(target=self._run_startup)
-            t.daemon = True
-            t.start()
-        else:
-            self._startup = None
+        self._on_painted()
 
 
 if __name__ == '__main__':
@@ -1302,9 +2331,9 @@ if __name__ == '__main__':
             self.SetSizer(sizer)
 
         def on_event(self, event):
-            print event
+            print(event)
 
-            print EVENT_MAPPING[event.GetEventType()], event.Position
+            print(EVENT_MAPPING[event.GetEventType()], event.Position)
 
     app = wx.App()
 